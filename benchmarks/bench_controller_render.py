@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+"""
+Frame-time benchmark for the controller view
+
+Animates both sticks, both triggers and a face button every frame on an
+XboxControllerWidget, with and without cached rasterization, and prints
+the view's paint time per frame. Runs offscreen; set QT_SCALE_FACTOR=2
+to measure a high-DPI screen.
+
+Usage:
+    python3 -m benchmarks.bench_controller_render [frames]
+"""
+
+import math
+import os
+import sys
+import time
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+from PySide6.QtCore import QObject, Signal
+from PySide6.QtWidgets import QApplication
+
+import controller
+from tabs.controlTab import XboxControllerWidget
+
+class NoDiscovery(QObject):
+    devices_changed = Signal()
+
+    def claim(self):
+        return None, None
+
+def frame_changes(i):
+    angle = i * 0.1
+    return {
+        "stick_left_x": int(32000 * math.cos(angle)),
+        "stick_left_y": int(32000 * math.sin(angle)),
+        "stick_right_x": int(20000 * math.sin(angle)),
+        "stick_right_y": int(20000 * math.cos(angle)),
+        "trigger_left": i * 37 % 1024,
+        "trigger_right": 1023 - i * 37 % 1024,
+        "a": (i // 10) % 2,
+    }
+
+def measure(app, cached, frames):
+    widget = XboxControllerWidget("xbox-one", 0, NoDiscovery(), cached=cached)
+    widget.resize(800, 600)
+    widget.show()
+    widget.disconnected.setVisible(False)
+    widget.state = controller.getdict(controller.ButtonData())
+    widget.apply_changes(dict(widget.state))
+    for _ in range(5):
+        app.processEvents()
+    widget.view.frame_times.clear()
+    widget.view.frame_times = type(widget.view.frame_times)(maxlen=frames)
+
+    start = time.perf_counter()
+    for i in range(frames):
+        widget.apply_changes(frame_changes(i))
+        widget.view.viewport().repaint()
+    elapsed = time.perf_counter() - start
+    mean_ms, max_ms = widget.view.frame_stats()
+    widget.close()
+    return mean_ms, max_ms, frames / elapsed
+
+def main(frames=300):
+    app = QApplication(sys.argv)
+    print(f"{'mode':<10}{'paint mean ms':>15}{'paint max ms':>14}{'frames/s':>10}")
+    for cached in (False, True):
+        mean_ms, max_ms, fps = measure(app, cached, frames)
+        print(f"{'cached' if cached else 'svg':<10}{mean_ms:>15.2f}{max_ms:>14.2f}{fps:>10.0f}")
+
+if __name__ == "__main__":
+    main(*(int(arg) for arg in sys.argv[1:2]))
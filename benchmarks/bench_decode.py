@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+"""
+Micro-benchmark for PowerAController report decoding
+
+Compares the reusable-buffer decode path against the previous one
+(new array per read, bytes() copy, create_string_buffer, from_buffer)
+for an idle pad (reports that differ only in their sequence number, as
+on real hardware) and a moving stick (every report changes). Prints reports per second and bytes allocated per report.
+
+Usage:
+    python3 -m benchmarks.bench_decode [num_reports]
+"""
+
+import array
+import ctypes
+import sys
+import time
+import tracemalloc
+
+import usb.core
+
+import controller
+
+class CannedDevice:
+    """Just enough of a usb.core.Device for PowerAController.__init__."""
+
+    class _Endpoint:
+        def __init__(self, address):
+            self.bEndpointAddress = address
+
+    def set_configuration(self):
+        pass
+
+    def get_active_configuration(self):
+        return {(0, 0): [self._Endpoint(0x81), self._Endpoint(0x01)]}
+
+    def write(self, ep, data, timeout=None):
+        return len(data)
+
+    def read(self, ep, size_or_buffer, timeout=None):
+        # keep the shared controller manager thread idle during the benchmark
+        time.sleep(timeout / 1000)
+        raise usb.core.USBTimeoutError("canned device")
+
+def make_report(stick_x=0, seq=0):
+    report = controller.ButtonData()
+    report.type = 0x20
+    report.id = seq & 0xFF  # the GIP sequence number, new on every report
+    report.a = 1
+    report.stick_left_x = stick_x
+    return array.array("B", bytes(report))
+
+def legacy_step(cont, report):
+    data = array.array("B", report) # dev.read(ep, 256) returned a new array
+    if data[0] == 0x20:
+        buffer = ctypes.create_string_buffer(bytes(data))
+        new_data = controller.ButtonData.from_buffer(buffer)
+        changes = controller.diff_buttons(cont.button_data, new_data)
+        with cont.lock:
+            cont.button_data = new_data
+        if changes:
+            cont.events.changed.emit(changes, time.perf_counter())
+
+def buffered_step(cont, report):
+    n = len(report)
+    cont._buf[:n] = report # dev.read(ep, cont._buf) fills the buffer in place
+    cont.decode_report(n)
+
+def measure(step, reports, num_reports):
+    cont = controller.PowerAController(0, dev=CannedDevice())
+    count = len(reports)
+
+    start = time.perf_counter()
+    for i in range(num_reports):
+        step(cont, reports[i % count])
+    elapsed = time.perf_counter() - start
+
+    tracemalloc.start()
+    total = 0
+    for i in range(min(num_reports, 20000)):
+        tracemalloc.reset_peak()
+        base = tracemalloc.get_traced_memory()[0]
+        step(cont, reports[i % count])
+        total += tracemalloc.get_traced_memory()[1] - base
+    tracemalloc.stop()
+
+    cont.connected = False
+    return num_reports / elapsed, total / min(num_reports, 20000)
+
+def main(num_reports=200000):
+    scenarios = {
+        "idle pad": [make_report(seq=seq) for seq in range(256)],
+        "moving stick": [make_report(x, seq) for seq, x in enumerate(range(-1000, 1000, 7))],
+    }
+    steps = {"legacy": legacy_step, "buffered": buffered_step}
+    print(f"{'scenario':<14}{'path':<10}{'reports/s':>12}{'alloc B/report':>16}")
+    for scenario, reports in scenarios.items():
+        for name, step in steps.items():
+            rate, alloc = measure(step, reports, num_reports)
+            print(f"{scenario:<14}{name:<10}{rate:>12.0f}{alloc:>16.1f}")
+
+if __name__ == "__main__":
+    main(*(int(arg) for arg in sys.argv[1:2]))
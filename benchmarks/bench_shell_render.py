@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+"""
+Frame-rate benchmark for the Shell tab terminal renderers
+
+Feeds synthetic output through pyte and redraws after every chunk, the
+way ShellTab.display_output does, with the HTML/QTextEdit renderer and
+the native glyph-grid TerminalView. Two workloads:
+    scroll  coloured `ls --color` style lines, every row changes per frame
+    top     a few rows rewritten in place per frame, like top/htop
+Runs offscreen; set QT_SCALE_FACTOR=2 to measure a high-DPI screen.
+
+Usage:
+    python3 -m benchmarks.bench_shell_render [frames]
+"""
+
+import os
+import sys
+import time
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+from PySide6.QtWidgets import QApplication
+
+from tabs.shellTab import SSHWorker, InteractiveShell, TerminalView
+
+COLORS = (31, 32, 33, 34, 35, 36, 91, 94)
+
+def scroll_chunk(i):
+    lines = []
+    for j in range(30):
+        n = i * 30 + j
+        lines.append(f"\x1b[01;{COLORS[n % len(COLORS)]}mentry_{n:06d}\x1b[0m  "
+                     f"{n * 7919 % 100000:>8}  \x1b[4mrover/logs/{n:x}.bag\x1b[0m  plain text tail")
+    return ("\r\n".join(lines) + "\r\n").encode()
+
+def top_chunk(i):
+    rows = []
+    for j in range(4):
+        y = 8 + (i + j) % 12
+        rows.append(f"\x1b[{y};1H\x1b[K{1000 + y:>6} rover  20  0 {i * 13 % 9999:>7}  "
+                    f"\x1b[7m{(i + y) % 100:>3}.0\x1b[0m  {(i * y) % 60:02d}:{i % 60:02d}.00 ros2_node_{y}")
+    return "".join(rows).encode()
+
+WORKLOADS = {"scroll": scroll_chunk, "top": top_chunk}
+
+def measure(app, cls, chunk, frames):
+    worker = SSHWorker("bench", "bench")
+    worker.connected = True
+    shell = cls(worker)
+    shell.resize(900, 640)
+    shell.show()
+    for _ in range(5):
+        app.processEvents()
+    paint = shell.viewport() if isinstance(shell, InteractiveShell) else shell
+
+    start = time.perf_counter()
+    for i in range(frames):
+        with worker.lock:
+            worker.stream.feed(chunk(i))
+            shell.refresh(worker.screen)
+        paint.repaint()
+    elapsed = time.perf_counter() - start
+    shell.close()
+    return elapsed / frames * 1000, frames / elapsed
+
+def main(frames=200):
+    app = QApplication(sys.argv)
+    print(f"{'workload':<10}{'renderer':<10}{'ms/frame':>10}{'frames/s':>10}")
+    for name, chunk in WORKLOADS.items():
+        for label, cls in (("html", InteractiveShell), ("native", TerminalView)):
+            ms, fps = measure(app, cls, chunk, frames)
+            print(f"{name:<10}{label:<10}{ms:>10.2f}{fps:>10.0f}")
+
+if __name__ == "__main__":
+    main(*(int(arg) for arg in sys.argv[1:2]))
@@ -0,0 +1,38 @@
+#!/usr/bin/env python3
+"""
+Replay the reference terminal captures through every Shell tab renderer
+
+Plays each benchmarks/captures/*.rvlog at max speed with shell_replay.play,
+once with frames capped at 60 Hz as in the GUI and once rendering after
+every chunk, and prints one row per capture and renderer. Record new
+captures with `shell_replay.py capture` (or ROVER_SHELL_RECORD on the rover
+link) and drop them in the captures folder.
+
+Usage:
+    python3 -m benchmarks.bench_shell_replay [capture.rvlog ...]
+"""
+
+import glob
+import os
+import sys
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+import shell_replay
+
+CAPTURES = os.path.join(os.path.dirname(__file__), "captures")
+
+def main(paths):
+    paths = paths or sorted(glob.glob(os.path.join(CAPTURES, "*.rvlog")))
+    print(f"{'capture':<18}{'renderer':<9}{'fps cap':>8}{'kB/s':>9}{'frames':>8}"
+          f"{'mean ms':>9}{'p99 ms':>8}{'max ms':>8}")
+    for path in paths:
+        name = os.path.splitext(os.path.basename(path))[0]
+        for renderer in ("none", "html", "native"):
+            for fps in ((60,) if renderer == "none" else (60, 0)):
+                r = shell_replay.play(path, realtime=False, renderer=renderer, fps=fps)
+                print(f"{name:<18}{renderer:<9}{fps or 'off':>8}{r['bytes_per_s'] / 1e3:>9.0f}{r['frames']:>8}"
+                      f"{r['frame_mean_ms']:>9.2f}{r['frame_p99_ms']:>8.2f}{r['frame_max_ms']:>8.2f}")
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -0,0 +1,63 @@
+#!/usr/bin/env python3
+"""
+Per-frame cost of the stick tilt transforms
+
+Compares XboxControllerWidget.joyMat (three QTransforms built from numpy
+scalar math per stick) with a StickTransformTable lookup, for the two
+sticks that are updated each frame. Also reports the one-off table build
+time and the worst error between the two over random stick positions.
+
+Usage:
+    python3 -m benchmarks.bench_stick_transform [frames]
+"""
+
+import os
+import random
+import sys
+import time
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+from PySide6.QtWidgets import QApplication
+
+from benchmarks.bench_controller_render import NoDiscovery
+from tabs.controlTab import XboxControllerWidget, StickTransformTable
+
+def main(frames=20000):
+    QApplication(sys.argv)
+    widget = XboxControllerWidget("xbox-one", 0, NoDiscovery())
+    item = widget.button_svgs["LS"][0]
+    cx = item.boundingRect().width() / 2
+    cy = item.boundingRect().height() / 2
+
+    rng = random.Random(0)
+    sticks = [(rng.uniform(-1, 1), rng.uniform(-1, 1)) for _ in range(2 * frames)]
+
+    start = time.perf_counter()
+    table = StickTransformTable(widget.amax, widget.joy_dist, cx, cy)
+    build_ms = 1000 * (time.perf_counter() - start)
+
+    start = time.perf_counter()
+    for x, y in sticks:
+        widget.joyMat(x, y, cx, cy)
+    joymat_us = 1e6 * (time.perf_counter() - start) / frames
+
+    start = time.perf_counter()
+    for x, y in sticks:
+        table.lookup(x, y)
+    table_us = 1e6 * (time.perf_counter() - start) / frames
+
+    # displacement error in scene units, from the mapped stick centre
+    err = 0.0
+    for x, y in sticks[:2000]:
+        a = widget.joyMat(x, y, cx, cy).map(cx, cy)
+        b = table.lookup(x, y).map(cx, cy)
+        err = max(err, abs(a[0] - b[0]), abs(a[1] - b[1]))
+
+    print(f"table build:        {build_ms:8.2f} ms ({table.steps + 1}^2 entries)")
+    print(f"joyMat per frame:   {joymat_us:8.2f} us (2 sticks)")
+    print(f"lookup per frame:   {table_us:8.2f} us (2 sticks)")
+    print(f"max centre error:   {err:8.3f} scene units")
+
+if __name__ == "__main__":
+    main(*(int(arg) for arg in sys.argv[1:2]))
@@ -0,0 +1,75 @@
+"""
+Compact timestamped byte logs
+
+A log is an 8 byte magic followed by records of
+    <uint64 ns since the first record> <uint32 length> <payload>
+Readers memory-map the file, so replaying a long log does not load it
+into memory.
+"""
+
+import mmap
+import struct
+import time
+from threading import Lock
+
+MAGIC = b"RVBLOG01"
+RECORD = struct.Struct("<QI")
+
+class ByteLogWriter:
+    def __init__(self, path):
+        self.file = open(path, "wb")
+        self.file.write(MAGIC)
+        self.t0 = None
+        self.lock = Lock()  # writer and close() may run on different threads
+
+    def write(self, data, t_ns=None):
+        """Append one record. t_ns defaults to time.monotonic_ns()."""
+        if t_ns is None:
+            t_ns = time.monotonic_ns()
+        with self.lock:
+            if self.file.closed:
+                return
+            if self.t0 is None:
+                self.t0 = t_ns
+            self.file.write(RECORD.pack(t_ns - self.t0, len(data)))
+            self.file.write(data)
+
+    def close(self):
+        with self.lock:
+            self.file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+class ByteLogReader:
+    def __init__(self, path):
+        self.file = open(path, "rb")
+        self.map = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ)
+        if self.map[:len(MAGIC)] != MAGIC:
+            self.close()
+            raise ValueError(f"{path} is not a byte log")
+        self.view = memoryview(self.map)
+
+    def __iter__(self):
+        """Yield (seconds since first record, payload memoryview)."""
+        offset = len(MAGIC)
+        end = len(self.map)
+        while offset + RECORD.size <= end:
+            t_ns, length = RECORD.unpack_from(self.map, offset)
+            offset += RECORD.size
+            yield t_ns / 1e9, self.view[offset:offset + length]
+            offset += length
+
+    def close(self):
+        self.view.release()
+        self.map.close()
+        self.file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
@@ -1,17 +1,148 @@
 import usb.core
 import usb.util
 import ctypes
-from threading import Thread
+import array
+import struct
+from threading import Thread, Lock, Event
 import time
+import latency
+from bytelog import ByteLogWriter
+from PySide6.QtCore import QObject, Signal
+
+try:
+    import usb1 # python-libusb1, only needed for hotplug notifications
+except ImportError:
+    usb1 = None
 
 _POWER_A_VENDOR = 0x20d6
+_REPORT_SIZE = 256 # read size per interrupt transfer
+_BUTTON_MSG = 0x20
+_GUIDE_MSG = 0x07
+
+# Output report priorities: lower is sent first, each has one coalescing
+# slot, and a queued kill drops whatever is behind it
+_OUT_KILL = 0
+_OUT_WAKEUP = 1
+_OUT_RUMBLE = 2
 
 def find_controllers():
    return [c.idProduct for c in usb.core.find(find_all=True, idVendor=_POWER_A_VENDOR)]
 
+class ControllerDiscovery(QObject):
+    """
+    Keeps one cached list of attached PowerA pads and hands them out to any
+    number of consumers. libusb hotplug callbacks trigger a rescan when they
+    are available; otherwise the bus is rescanned every fallback_interval
+    seconds. request_rescan() forces an immediate one (e.g. after a read
+    error), which emits devices_changed even if the list did not change, so
+    consumers can claim again from the fresh list.
+    """
+    devices_changed = Signal()
+
+    def __init__(self, fallback_interval=2.0):
+        super().__init__()
+        self.devices = {}  # (bus, address) -> usb.core.Device
+        self.claimed = set()
+        self.lock = Lock()
+        self._wake = Event()
+        self.running = True
+        self.hotplug = False
+        self.scan_failed = False  # the last scan's error was already logged
+        self._notify = False  # a rescan was requested: announce its result
+        if usb1 is not None:
+            try:
+                if usb1.hasCapability(usb1.CAP_HAS_HOTPLUG):
+                    self.usb_context = usb1.USBContext()
+                    self.usb_context.hotplugRegisterCallback(self._on_hotplug, vendor_id=_POWER_A_VENDOR)
+                    self.hotplug = True
+                    Thread(target=self._handle_hotplug_events, daemon=True).start()
+            except (OSError, usb1.USBError) as e:
+                print("USB hotplug unavailable, polling instead:", e)
+        # with hotplug the periodic rescan is only a safety net
+        self.interval = 30.0 if self.hotplug else fallback_interval
+        Thread(target=self._run, daemon=True).start()
+
+    def _on_hotplug(self, context, device, event):
+        # runs inside libusb event handling: only schedule the rescan here
+        self._wake.set()
+        return False
+
+    def _handle_hotplug_events(self):
+        while self.running:
+            self.usb_context.handleEventsTimeout(tv=0.5)
+
+    def _run(self):
+        while self.running:
+            self.rescan()
+            self._wake.wait(self.interval)
+            self._wake.clear()
+
+    def rescan(self):
+        try:
+            found = usb.core.find(find_all=True, idVendor=_POWER_A_VENDOR)
+            found = dict(((d.bus, d.address), d) for d in found)
+        except (usb.core.USBError, usb.core.NoBackendError) as e:
+            # keep discovery alive: the next wakeup tries again
+            if not self.scan_failed:
+                print("USB scan failed:", e)
+                self.scan_failed = True
+            return
+        self.scan_failed = False
+        notify, self._notify = self._notify, False
+        with self.lock:
+            if found.keys() == self.devices.keys() and not notify:
+                return
+            # keep the Device objects already handed out for unchanged keys
+            self.devices = dict((key, self.devices.get(key, dev)) for key, dev in found.items())
+            self.claimed &= self.devices.keys()
+        self.devices_changed.emit()
+
+    def request_rescan(self, notify=True):
+        """Rescan now; with notify, emit devices_changed even if nothing changed."""
+        self._notify = self._notify or notify
+        self._wake.set()
+
+    def claim(self):
+        """Return (key, device) for the first unclaimed pad, or (None, None)."""
+        with self.lock:
+            for key in sorted(self.devices):
+                if key not in self.claimed:
+                    self.claimed.add(key)
+                    return key, self.devices[key]
+        return None, None
+
+    def release(self, key):
+        with self.lock:
+            self.claimed.discard(key)
+
+    def stop(self):
+        self.running = False
+        self._wake.set()
+
 def getdict(struct):
     return dict((field[0], getattr(struct, field[0])) for field in struct._fields_)
 
+def diff_buttons(old, new):
+    """
+    Return {field: value} for every button/axis field of new that differs
+    from old. Either can be a ButtonData or a raw report buffer. The GIP
+    header (type, const_0, id) is left out: its sequence number changes
+    with every report.
+    """
+    changes = {}
+    for name, a, b in zip(_BUTTON_NAMES, _BUTTON_LAYOUT.unpack_from(old, _HEADER_SIZE),
+                          _BUTTON_LAYOUT.unpack_from(new, _HEADER_SIZE)):
+        if a == b:
+            continue
+        if type(name) is str:
+            changes[name] = b
+        else:  # a byte of one-bit buttons, lowest bit first
+            flipped = a ^ b
+            for bit, button in enumerate(name):
+                if flipped >> bit & 1:
+                    changes[button] = b >> bit & 1
+    return changes
+
 
 class ButtonData(ctypes.Structure):
     _pack_ = 1
@@ -43,14 +174,32 @@ class ButtonData(ctypes.Structure):
         ("stick_right_y",ctypes.c_int16)
     ]
 
+_BUTTON_SIZE = ctypes.sizeof(ButtonData)
+_HEADER_SIZE = ButtonData.sync.offset  # type, const_0 and the id/sequence number
+# the same layout after the header for struct, so reports can be compared
+# without going through ctypes attribute access; the bitfield bytes unpack whole
+_BUTTON_LAYOUT = struct.Struct("<BBHHhhhh")
+_BUTTON_NAMES = (tuple(field[0] for field in ButtonData._fields_[3:11]),
+                 tuple(field[0] for field in ButtonData._fields_[11:19]),
+                 "trigger_left", "trigger_right",
+                 "stick_left_x", "stick_left_y", "stick_right_x", "stick_right_y")
+
+class ControllerEvents(QObject):
+    # only the ButtonData fields (or "guide") that changed, and the
+    # perf_counter() time the report was read
+    changed = Signal(dict, float)
+    disconnected = Signal()
+
+
 class PowerAController():
-    def __init__(self,id):
+    def __init__(self,id,dev=None,manager=None):
+        # dev lets a caller hand over an already found (or stand-in) device;
+        # reads are serviced by manager (the shared ControllerManager by default)
         self.started = False
-        self.dev = usb.core.find(idVendor=_POWER_A_VENDOR, idProduct=id)
+        self.dev = dev if dev is not None else usb.core.find(idVendor=_POWER_A_VENDOR, idProduct=id)
         time.sleep(0.5)
         self.dev.set_configuration()
         self.cfg = self.dev.get_active_configuration()
-        self.data = []
         intf = self.cfg[(0,0)]  # First configuration/interface/endpoint
         self.guide = 0
         self.connected = False
@@ -63,15 +212,48 @@ class PowerAController():
             intf,
             custom_match=lambda e: usb.util.endpoint_direction(e.bEndpointAddress) == usb.util.ENDPOINT_OUT
         )
-        self.button_data = ButtonData()
+        # Reports are read into one reusable buffer and compared raw against
+        # the last published one; button_data is a ButtonData view over that.
+        self._buf = array.array("B", bytes(_REPORT_SIZE))
+        self._raw = memoryview(self._buf)[:_BUTTON_SIZE]
+        self._last_buf = bytearray(_BUTTON_SIZE)
+        self._last_raw = memoryview(self._last_buf)
+        # what the idle check compares: everything after the header
+        self._body = self._raw[_HEADER_SIZE:]
+        self._last_body = self._last_raw[_HEADER_SIZE:]
+        self.button_data = ButtonData.from_buffer(self._last_buf)
+        self.lock = Lock()  # guards button_data/guide against the manager thread
+        self.events = ControllerEvents()
+        self.recorder = None
+        self._out = {}  # priority -> (packet, timeout), sent by the manager thread
+        self._out_lock = Lock()
+        self.t_read = 0.0 # perf_counter() time of the last published report
+        self.finished = Event()
         self.wakeup()
-        self.runningThread = Thread(target=self.operation)
-        self.runningThread.daemon = True
-        self.runningThread.start()
+        self.manager = manager if manager is not None else get_manager()
+        self.manager.add(self)
+
+    def snapshot(self):
+        """Consistent copy of the latest state as a dict, including guide."""
+        with self.lock:
+            state = getdict(self.button_data)
+            state["guide"] = self.guide
+            state["t_read"] = self.t_read
+        return state
+
+    def start_recording(self, path):
+        """Log every raw button/guide report to path (see bytelog.py)."""
+        self.recorder = ByteLogWriter(path)
+
+    def stop_recording(self):
+        recorder, self.recorder = self.recorder, None
+        if recorder is not None:
+            recorder.close()
+
     def stop(self):
+        self.kill_connection()  # sent by the manager thread on its way out
         self.connected = False
-        self.runningThread.join()
-        self.kill_connection()
+        self.finished.wait()
         
     def rumble(self,num_pulses=1,pulse_length=0x80,forces=[0.1,0.1,0.1,0.1]):
         start_rumble = b'\x09\x08\x00\x08\x00'
@@ -88,34 +270,161 @@ class PowerAController():
         start_rumble += b'\x00'
         start_rumble += bytes([num_pulses])
         
-        self.dev.write(self.ep_out.bEndpointAddress,start_rumble)    
+        # a newer rumble replaces one that has not been sent yet
+        self._queue_output(_OUT_RUMBLE, start_rumble)
     
-    def operation(self):
-        self.read_buttons()
-        
     def wakeup(self):
-        self.dev.write(self.ep_out.bEndpointAddress,b'\x05\x20',timeout=0)
+        self._queue_output(_OUT_WAKEUP, b'\x05\x20', timeout=0)
         self.connected = True
         
     def kill_connection(self):
-        self.dev.write(self.ep_out.bEndpointAddress,b'\x01\x20\x00\x00\x00\x00\x00\x00\x00\x0e',timeout=0)
+        self._queue_output(_OUT_KILL, b'\x01\x20\x00\x00\x00\x00\x00\x00\x00\x0e', timeout=0)
+
+    def _queue_output(self, priority, packet, timeout=None):
+        """Queue an output report; returns immediately from any thread."""
+        with self._out_lock:
+            self._out[priority] = (packet, timeout)
+
+    def flush_output(self):
+        """Send queued output reports in priority order (manager thread only)."""
+        with self._out_lock:
+            pending = sorted(self._out.items())
+            self._out.clear()
+        for priority, (packet, timeout) in pending:
+            try:
+                self.dev.write(self.ep_out.bEndpointAddress, packet, timeout=timeout)
+            except usb.core.USBError as e:
+                print("controller write failed:", e)
+            if priority == _OUT_KILL:
+                break
     
-    def read_buttons(self):
+    def service(self, timeout):
+        """
+        One read/decode step with a timeout in ms, run by the manager thread.
+        Returns False once the controller is stopped or has gone away.
+        """
         self.started = True
-        while self.connected:
-            try:
-                self.data = self.dev.read(self.ep_in.bEndpointAddress, 256,timeout=10)
-                if len(self.data) == 0:
-                    continue
-            except usb.core.USBTimeoutError:
+        if self._out:
+            self.flush_output()
+        if not self.connected:
+            return False
+        try:
+            n = self.dev.read(self.ep_in.bEndpointAddress, self._buf, timeout=timeout)
+        except usb.core.USBTimeoutError:
+            return True
+        except usb.core.USBError:
+            self.connected = False
+            self.events.disconnected.emit()
+            return False
+        if n == 0:
+            return True
+        if self.recorder is not None and self._buf[0] in (_BUTTON_MSG, _GUIDE_MSG):
+            self.recorder.write(memoryview(self._buf)[:n])
+        self.decode_report(n)
+        return True
+
+    def finish(self):
+        """Called by the manager once the controller is dropped."""
+        try:
+            self.flush_output()
+            self.stop_recording()
+        finally:
+            self.finished.set()  # stop() waits on this whatever went wrong
+
+    def decode_report(self, n):
+        """Decode the n-byte report sitting in the read buffer.
+
+        Repeated reports are rejected with a buffer compare that skips the
+        header (its sequence number changes every report), so an idle pad
+        costs no allocations; only a changed report builds an event payload.
+        The read timestamp is taken right after that compare, which keeps the
+        idle path allocation free at the cost of well under a microsecond.
+        """
+        if self._buf[0] == _BUTTON_MSG: # if button data msg
+            if n < _BUTTON_SIZE or self._body == self._last_body:
+                return
+            t_read = time.perf_counter()
+            changes = diff_buttons(self._last_raw, self._raw)
+            with self.lock:
+                self._last_raw[:] = self._raw
+                self.t_read = t_read
+            latency.since("read->emit", t_read)
+            self.events.changed.emit(changes, t_read)
+        elif self._buf[0] == _GUIDE_MSG: #guide button msg
+            if self._buf[4] != self.guide:
+                t_read = time.perf_counter()
+                with self.lock:
+                    self.guide = self._buf[4]
+                    self.t_read = t_read
+                latency.since("read->emit", t_read)
+                self.events.changed.emit({"guide": self.guide}, t_read)
+
+class ControllerManager():
+    """
+    Services every attached controller from one thread.
+
+    pyusb only offers blocking reads, so each pass gives every controller
+    one read with a short timeout. The timeout is period_ms split between
+    the pads (but at least min_slice_ms), so an idle pad is read at most
+    1000/period_ms times a second however many are attached, and a report
+    waits at most (pads - 1) * slice for its turn. A lone pad just waits
+    in its read: reports still come back as soon as they arrive.
+    """
+    def __init__(self, period_ms=10, min_slice_ms=2):
+        self.period_ms = period_ms
+        self.min_slice_ms = min_slice_ms
+        self.controllers = ()  # replaced, never mutated, so the loop can iterate it lock-free
+        self.lock = Lock()
+        self._added = Event()
+        Thread(target=self._run, daemon=True).start()
+
+    def add(self, cont):
+        with self.lock:
+            self.controllers = self.controllers + (cont,)
+        self._added.set()
+
+    def remove(self, cont):
+        with self.lock:
+            self.controllers = tuple(c for c in self.controllers if c is not cont)
+
+    def _run(self):
+        while True:
+            if not self.controllers:
+                self._added.wait()
+                self._added.clear()
                 continue
-            except usb.core.USBError:
-                self.connected = False
-                
-            if self.data[0] == 0x20: # if button data msg
-                buffer = ctypes.create_string_buffer(bytes(self.data))
-                self.button_data = ButtonData.from_buffer(buffer)
-            elif self.data[0] == 0x07: #guide button msg
-                self.guide = self.data[4]
-        
-        
\ No newline at end of file
+            controllers = self.controllers
+            slice_ms = max(self.min_slice_ms, self.period_ms // len(controllers))
+            for cont in controllers:
+                try:
+                    alive = cont.service(slice_ms)
+                except RuntimeError:
+                    # Qt side deleted under us (app shutting down); one pad
+                    # must not take the shared thread down with it
+                    alive = False
+                except Exception as e:
+                    # nor may anything else one pad raises: drop just that pad
+                    print("controller failed, detaching it:", repr(e))
+                    alive = False
+                    cont.connected = False
+                    try:
+                        cont.events.disconnected.emit()
+                    except RuntimeError:
+                        pass
+                if not alive:
+                    self.remove(cont)
+                    try:
+                        cont.finish()
+                    except Exception as e:
+                        print("controller cleanup failed:", repr(e))
+
+_manager = None
+_manager_lock = Lock()
+
+def get_manager():
+    """The shared ControllerManager, started on first use."""
+    global _manager
+    with _manager_lock:
+        if _manager is None:
+            _manager = ControllerManager()
+        return _manager
@@ -0,0 +1,145 @@
+#!/usr/bin/env python3
+"""
+Record and replay PowerA controller report streams
+
+A recording holds the raw 0x20 (buttons) and 0x07 (guide) reports with
+their arrival times (see bytelog.py). ReplayDevice plays one back through
+the dev.read/dev.write surface that controller.PowerAController uses, so
+the Control tab and teleop paths can run without a pad.
+
+Usage:
+    python3 controller_replay.py record out.rvlog [seconds]
+    python3 controller_replay.py play in.rvlog [--max-speed] [--loop]
+"""
+
+import array
+import sys
+from collections import deque
+import time
+
+import usb.core
+
+from bytelog import ByteLogReader
+
+class _Endpoint:
+    def __init__(self, address):
+        self.bEndpointAddress = address
+
+class ReplayDevice:
+    """Stand-in for usb.core.Device that serves reports from a byte log.
+
+    realtime=True paces reads by the recorded timestamps (scaled by
+    speed); otherwise reports are served as fast as they are read. When
+    the log runs out the device raises USBError like an unplugged pad,
+    unless loop is set.
+    """
+
+    idProduct = 0
+
+    def __init__(self, path, realtime=True, speed=1.0, loop=False):
+        self.path = path
+        self.realtime = realtime
+        self.speed = speed
+        self.loop = loop
+        self.log = ByteLogReader(path)
+        self.records = iter(self.log)
+        self.start = None
+        self.pending = None
+        self.writes = deque(maxlen=256)  # recent output reports, for inspection
+
+    def set_configuration(self):
+        pass
+
+    def get_active_configuration(self):
+        return {(0, 0): [_Endpoint(0x81), _Endpoint(0x01)]}
+
+    def write(self, ep, data, timeout=None):
+        self.writes.append(bytes(data))
+        return len(data)
+
+    def _next_record(self):
+        if self.pending is None:
+            self.pending = next(self.records, None)
+            if self.pending is None and self.loop:
+                self.records = iter(self.log)
+                self.start = None
+                self.pending = next(self.records, None)
+        return self.pending
+
+    def read(self, ep, size_or_buffer, timeout=None):
+        record = self._next_record()
+        if record is None:
+            raise usb.core.USBError("end of replay")
+        t, payload = record
+        if self.realtime:
+            now = time.monotonic()
+            if self.start is None:
+                self.start = now - t / self.speed
+            wait = self.start + t / self.speed - now
+            if timeout and wait > timeout / 1000:
+                time.sleep(timeout / 1000)
+                raise usb.core.USBTimeoutError("replay timeout")
+            if wait > 0:
+                time.sleep(wait)
+        self.pending = None
+        n = len(payload)
+        if isinstance(size_or_buffer, array.array):
+            memoryview(size_or_buffer)[:n] = payload
+            return n
+        return array.array("B", payload)
+
+    def close(self):
+        self.pending = None
+        self.records = iter(())
+        self.log.close()
+
+def record(path, seconds=60.0):
+    import controller
+    avail = controller.find_controllers()
+    if not avail:
+        print("No controller connected")
+        return False
+    cont = controller.PowerAController(avail[0])
+    cont.start_recording(path)
+    print(f"Recording controller {avail[0]:#06x} to {path} for {seconds:.0f} s...")
+    time.sleep(seconds)
+    cont.stop()
+    return True
+
+def play(path, realtime=True, loop=False):
+    import controller
+    import signal
+    from PySide6.QtCore import QCoreApplication
+
+    app = QCoreApplication(sys.argv)
+    dev = ReplayDevice(path, realtime=realtime, loop=loop)
+    cont = controller.PowerAController(0, dev=dev)
+    counts = {"events": 0}
+    start = time.monotonic()
+
+    def on_changed(changes, t_read):
+        counts["events"] += 1
+
+    def on_disconnected():
+        elapsed = time.monotonic() - start
+        print(f"{counts['events']} change events in {elapsed:.2f} s "
+              f"({counts['events'] / elapsed:.0f} events/s)")
+        app.quit()
+
+    cont.events.changed.connect(on_changed)
+    cont.events.disconnected.connect(on_disconnected)
+    if loop:
+        signal.signal(signal.SIGINT, signal.SIG_DFL)  # let Ctrl+C end the Qt loop
+        print("Looping, press Ctrl+C to stop")
+    app.exec()
+    cont.finished.wait()
+    dev.close()
+
+if __name__ == "__main__":
+    if len(sys.argv) < 3 or sys.argv[1] not in ("record", "play"):
+        print(__doc__)
+        sys.exit(1)
+    if sys.argv[1] == "record":
+        ok = record(sys.argv[2], *(float(arg) for arg in sys.argv[3:4]))
+        sys.exit(0 if ok else 1)
+    play(sys.argv[2], realtime="--max-speed" not in sys.argv, loop="--loop" in sys.argv)
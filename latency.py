@@ -0,0 +1,141 @@
+"""
+Input latency histograms
+
+LatencyHistogram is an HDR-style log-linear histogram: values (in
+microseconds) are bucketed exactly below 128 us and above that into
+buckets between 1/128 and 1/64 of the value wide (a relative precision
+of 0.8-1.6%), up to about a minute, so recording is O(1) and memory is a
+few KB no matter how many samples are taken.
+
+Stages are recorded into the shared STAGES registry with record(stage,
+seconds). The controller pipeline uses:
+    read->emit     USB report received -> change event emitted (manager thread)
+    read->gui      report received -> scene items updated (GUI thread)
+    read->paint    report received -> controller view painted
+    read->command  report received -> first teleop datagram carrying it
+The camera view adds:
+    switch->paint  camera selected -> its first frame painted
+"""
+
+import time
+from threading import Lock
+
+SUB_BUCKET_BITS = 7
+SUB_BUCKETS = 1 << SUB_BUCKET_BITS
+HALF = SUB_BUCKETS // 2
+MAX_US = 60_000_000
+
+def _index(us):
+    if us < SUB_BUCKETS:
+        return us
+    shift = us.bit_length() - SUB_BUCKET_BITS
+    return shift * HALF + (us >> shift)
+
+def _lowest(index):
+    """Smallest value (us) that falls into bucket index."""
+    if index < SUB_BUCKETS:
+        return index
+    shift = index // HALF - 1
+    return (index - shift * HALF) << shift
+
+def _highest(index):
+    return _lowest(index + 1) - 1
+
+class LatencyHistogram:
+    def __init__(self):
+        self.counts = [0] * (_index(MAX_US) + 1)
+        self.lock = Lock()
+        self.reset()
+
+    def reset(self):
+        with self.lock:
+            for i in range(len(self.counts)):
+                self.counts[i] = 0
+            self.total = 0
+            self.sum_us = 0
+            self.min_us = None
+            self.max_us = 0
+
+    def record(self, seconds):
+        us = min(max(int(seconds * 1e6), 0), MAX_US)
+        with self.lock:
+            self.counts[_index(us)] += 1
+            self.total += 1
+            self.sum_us += us
+            self.max_us = max(self.max_us, us)
+            self.min_us = us if self.min_us is None else min(self.min_us, us)
+
+    def percentile(self, p):
+        """Upper bound (us) of the bucket holding the p-th percentile."""
+        with self.lock:
+            if self.total == 0:
+                return 0
+            target = max(1, int(self.total * p / 100 + 0.5))
+            seen = 0
+            for i, count in enumerate(self.counts):
+                seen += count
+                if seen >= target:
+                    return min(_highest(i), self.max_us)
+        return self.max_us
+
+    def summary(self):
+        """count, mean and common percentiles, all in microseconds."""
+        mean = self.sum_us / self.total if self.total else 0
+        return {
+            "count": self.total,
+            "mean": mean,
+            "p50": self.percentile(50),
+            "p90": self.percentile(90),
+            "p99": self.percentile(99),
+            "p99.9": self.percentile(99.9),
+            "max": self.max_us,
+        }
+
+    def distribution(self):
+        """(value us, percentile, cumulative count) per non-empty bucket."""
+        with self.lock:
+            rows = []
+            seen = 0
+            for i, count in enumerate(self.counts):
+                if count:
+                    seen += count
+                    rows.append((min(_highest(i), self.max_us), seen / self.total, seen))
+        return rows
+
+STAGES = {}
+_stages_lock = Lock()
+
+def stage(name):
+    with _stages_lock:
+        if name not in STAGES:
+            STAGES[name] = LatencyHistogram()
+        return STAGES[name]
+
+def record(name, seconds):
+    stage(name).record(seconds)
+
+def since(name, t_read):
+    """Record the time elapsed since the perf_counter() timestamp t_read."""
+    stage(name).record(time.perf_counter() - t_read)
+
+def reset_all():
+    for hist in list(STAGES.values()):
+        hist.reset()
+
+def summary_text():
+    lines = [f"{'stage':<16}{'count':>9}{'mean':>9}{'p50':>9}{'p90':>9}{'p99':>9}{'p99.9':>9}{'max':>9}  (ms)"]
+    for name, hist in sorted(STAGES.items()):
+        s = hist.summary()
+        lines.append(f"{name:<16}{s['count']:>9}" + "".join(
+            f"{s[key] / 1000:>9.2f}" for key in ("mean", "p50", "p90", "p99", "p99.9", "max")))
+    return "\n".join(lines)
+
+def dump(path):
+    """Write the summary and each stage's percentile distribution to path."""
+    with open(path, "w") as f:
+        f.write(time.strftime("# latency dump %Y-%m-%d %H:%M:%S\n"))
+        f.write(summary_text() + "\n")
+        for name, hist in sorted(STAGES.items()):
+            f.write(f"\n# {name}\n{'Value(ms)':>12}{'Percentile':>14}{'TotalCount':>12}\n")
+            for value, pct, seen in hist.distribution():
+                f.write(f"{value / 1000:>12.3f}{pct:>14.6f}{seen:>12}\n")
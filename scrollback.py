@@ -0,0 +1,155 @@
+"""
+Bounded terminal scrollback with an incremental search index
+
+ScrollbackScreen is a pyte.Screen that keeps the lines scrolled off its top
+in a Scrollback ring of at most max_lines. Lines are stored compactly as
+their text plus runs of shared style tuples, so ten thousand lines cost a
+few MB instead of one pyte Char per cell.
+
+Scrollback also keeps a trigram index over blocks of BLOCK lines. It is
+updated as each line arrives and pruned as blocks are evicted, so a search
+only reads the lines of blocks that contain every trigram of the query.
+Searches are case-insensitive.
+"""
+
+from bisect import bisect_left
+from collections import deque
+
+import pyte
+from pyte.screens import Char, Margins
+from wcwidth import wcwidth
+
+BLOCK = 32
+_DEFAULT = Char(" ")[1:]
+
+def _trigrams(text):
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+class Scrollback:
+    def __init__(self, max_lines=10000):
+        self.max_lines = max_lines
+        self.lines = deque()  # (text, runs); runs = ((column, style or None), ...)
+        self.first = 0        # line number of lines[0]; numbers never repeat
+        self.styles = {}      # interned Char fields after data
+        self.index = {}       # trigram -> deque of block numbers, ascending
+        self.evicting = set()  # trigrams of the partly evicted oldest block
+
+    @property
+    def total(self):
+        """Line number the next appended line will get."""
+        return self.first + len(self.lines)
+
+    def __len__(self):
+        return len(self.lines)
+
+    def append(self, row, columns):
+        """Store one pyte buffer row (a dict of column -> Char)."""
+        text = []
+        runs = []
+        used = 0  # length of text up to the last non-blank or styled cell
+        last = 0  # not a valid style, so the first cell starts a run
+        styles = self.styles
+        for x in range(columns):
+            char = row.get(x)
+            if char is None:
+                text.append(" ")
+                style = None
+            else:
+                text.append(char.data)
+                style = char[1:]
+                style = styles.setdefault(style, style)
+                if char.data != " " or style != _DEFAULT:
+                    used = len(text)
+            if style is not last:
+                runs.append((x, style))
+                last = style
+        self.add_line("".join(text[:used]), tuple(runs))
+
+    def add_line(self, text, runs=((0, None),)):
+        number = self.total
+        self.lines.append((text, runs))
+        block = number // BLOCK
+        trigrams = _trigrams(text.lower())
+        index = self.index
+        for t in trigrams:
+            postings = index.get(t)
+            if postings is None:
+                index[t] = deque((block,))
+            elif postings[-1] != block:
+                postings.append(block)
+        if len(self.lines) > self.max_lines:
+            self._evict()
+
+    def _evict(self):
+        text, _ = self.lines.popleft()
+        self.evicting.update(_trigrams(text.lower()))
+        self.first += 1
+        if self.first % BLOCK:
+            return
+        # the whole block is gone; it is the oldest, so it leads its postings
+        block = self.first // BLOCK - 1
+        for t in self.evicting:
+            postings = self.index[t]
+            if postings[0] == block:
+                postings.popleft()
+            if not postings:
+                del self.index[t]
+        self.evicting = set()
+
+    def text(self, number):
+        return self.lines[number - self.first][0]
+
+    def row(self, number):
+        """Rebuild line number as a pyte-style dict of column -> Char."""
+        text, runs = self.lines[number - self.first]
+        row = {}
+        run = 0
+        x = 0
+        for ch in text:
+            while run + 1 < len(runs) and runs[run + 1][0] <= x:
+                run += 1
+            style = runs[run][1]
+            row[x] = Char(ch) if style is None else Char(ch, *style)
+            x += 2 if wcwidth(ch) == 2 else 1
+        return row
+
+    def search(self, query):
+        """Line numbers containing query, oldest first."""
+        q = query.lower()
+        if not q:
+            return []
+        if len(q) < 3:
+            numbers = range(self.first, self.total)
+        else:
+            postings = [self.index.get(t) for t in _trigrams(q)]
+            if not all(postings):
+                return []
+            postings.sort(key=len)
+            blocks = set(postings[0])
+            for p in postings[1:]:
+                blocks.intersection_update(p)
+                if not blocks:
+                    return []
+            numbers = (n for b in sorted(blocks)
+                       for n in range(max(b * BLOCK, self.first), min((b + 1) * BLOCK, self.total)))
+        return [n for n in numbers if q in self.lines[n - self.first][0].lower()]
+
+    def find(self, query, before):
+        """Newest line number below before that contains query, or None."""
+        matches = self.search(query)
+        i = bisect_left(matches, before)
+        return matches[i - 1] if i else None
+
+class ScrollbackScreen(pyte.Screen):
+    """pyte.Screen that saves lines scrolled off the top into self.history."""
+
+    def __init__(self, columns, lines, max_history=10000):
+        self.history = Scrollback(max_history)
+        super().__init__(columns, lines)
+
+    def index(self):
+        top, bottom = self.margins or Margins(0, self.lines - 1)
+        # only a full-screen scroll pushes a line into history, not a scroll region
+        if self.cursor.y == bottom and top == 0:
+            self.history.append(self.buffer[top], self.columns)
+        super().index()
@@ -0,0 +1,225 @@
+"""
+Chunked, resumable SFTP downloads from the rover
+
+A Download splits the remote file into CHUNK sized pieces and fetches them
+with several workers, each on its own SFTP channel of the shared SSHPool
+transport. Each worker asks for a whole chunk with one readv, so paramiko
+keeps all of its 32 KB requests in flight at once instead of waiting a
+round trip per request.
+
+Chunks are written in place into <name>.part. A journal next to it
+(<name>.part.json) records the sha256 of every finished chunk. If the
+link drops, the download backs off and retries; on a retry, or a later
+run for the same file, chunks whose local data still matches the journal
+are kept and only the rest are fetched. When every chunk is in, the whole
+file is checked against `sha256sum` on the rover (skipped if the rover
+can't run it) before .part is renamed into place. A file that fails that
+check is downloaded again from scratch, once.
+"""
+
+import hashlib
+import json
+import os
+import posixpath
+import random
+import shlex
+import threading
+
+import paramiko
+
+CHUNK = 1024 * 1024
+REQUEST = 32768  # paramiko's largest SFTP read request
+WORKERS = 4
+_LINK_ERRORS = (paramiko.SSHException, OSError, EOFError)
+
+class TransferError(Exception):
+    pass
+
+class ChecksumMismatch(TransferError):
+    pass
+
+class Download:
+    def __init__(self, pool, remote, local_dir, workers=WORKERS, chunk_size=CHUNK):
+        self.pool = pool
+        self.remote = remote
+        self.local = os.path.join(local_dir, posixpath.basename(remote))
+        self.part = self.local + ".part"
+        self.journal_path = self.part + ".json"
+        self.workers = workers
+        self.chunk_size = chunk_size
+        self.size = None
+        self.done_bytes = 0  # bytes in finished chunks
+        self.received = 0    # bytes off the wire, including retried chunks, for throughput
+        self.state = "queued"
+        self.attempts = 0
+        self.restarted = False  # already started over after a checksum mismatch
+        self.cancelled = threading.Event()
+        self.lock = threading.Lock()
+        self.thread = None
+
+    @property
+    def finished(self):
+        return self.thread is not None and not self.thread.is_alive()
+
+    def start(self):
+        self.thread = threading.Thread(target=self.run, daemon=True)
+        self.thread.start()
+
+    def cancel(self):
+        self.cancelled.set()
+
+    def run(self):
+        while not self.cancelled.is_set():
+            try:
+                self.transfer()
+                return
+            except ChecksumMismatch as e:
+                if self.restarted:
+                    self.state = f"failed: {e}"
+                    return
+                self.restarted = True
+                self.done_bytes = 0
+                self.state = "checksum mismatch, starting over"
+            except (TransferError, FileNotFoundError, PermissionError, IsADirectoryError) as e:
+                self.state = f"failed: {e}"
+                return
+            except _LINK_ERRORS as e:
+                if self.cancelled.is_set():
+                    break
+                self.attempts += 1
+                cap = min(30.0, 2.0 ** self.attempts)
+                delay = cap / 2 + random.uniform(0, cap / 2)
+                self.state = f"retrying in {delay:.0f} s ({e or type(e).__name__})"
+                if self.cancelled.wait(delay):
+                    break
+            except Exception as e:
+                # anything unexpected must still end the row, not leave it "downloading"
+                self.state = f"failed: {e or type(e).__name__}"
+                return
+        self.state = "cancelled"
+
+    def transfer(self):
+        self.state = "connecting"
+        sftp = self.pool.open_sftp()
+        try:
+            st = sftp.stat(self.remote)
+        finally:
+            sftp.close()
+        self.size = st.st_size
+        count = max(1, -(-self.size // self.chunk_size))
+        done = self.load_journal(st.st_mtime)
+        self.done_bytes = sum(self.chunk_len(i) for i in done)
+        pending = [i for i in range(count) if i not in done]
+
+        if not os.path.exists(self.part):
+            open(self.part, "wb").close()
+        with open(self.part, "r+b") as f:
+            f.truncate(self.size)
+            if pending:
+                self.state = "downloading"
+                self.fetch(f.fileno(), pending, done, st.st_mtime)
+            os.fsync(f.fileno())
+
+        self.state = "verifying"
+        self.verify()
+        os.replace(self.part, self.local)
+        os.remove(self.journal_path)
+        self.attempts = 0
+        self.state = "done"
+
+    def chunk_len(self, i):
+        return min(self.chunk_size, self.size - i * self.chunk_size)
+
+    def fetch(self, fd, pending, done, mtime):
+        queue = list(reversed(pending))
+        errors = []
+
+        def worker():
+            try:
+                sftp = self.pool.open_sftp()
+            except Exception as e:
+                errors.append(e)
+                return
+            try:
+                with sftp.open(self.remote, "rb") as remote:
+                    while not errors and not self.cancelled.is_set():
+                        with self.lock:
+                            if not queue:
+                                return
+                            i = queue.pop()
+                        offset = i * self.chunk_size
+                        length = self.chunk_len(i)
+                        requests = [(o, min(REQUEST, offset + length - o))
+                                    for o in range(offset, offset + length, REQUEST)]
+                        digest = hashlib.sha256()
+                        for (o, _), data in zip(requests, remote.readv(requests)):
+                            try:
+                                os.pwrite(fd, data, o)
+                            except OSError as e:
+                                # a local disk error is not worth retrying like a link error
+                                raise TransferError(f"writing {self.part}: {e}") from e
+                            digest.update(data)
+                            with self.lock:
+                                self.received += len(data)
+                        with self.lock:
+                            done[i] = digest.hexdigest()
+                            self.done_bytes += length
+                            self.save_journal(done, mtime)
+            except Exception as e:
+                errors.append(e)
+            finally:
+                sftp.close()
+
+        threads = [threading.Thread(target=worker, daemon=True) for _ in range(min(self.workers, len(pending)))]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        if errors:
+            raise errors[0]
+        if self.cancelled.is_set():
+            raise EOFError("cancelled")
+
+    def load_journal(self, mtime):
+        """Finished chunks {index: sha256} whose data in .part still checks out."""
+        try:
+            with open(self.journal_path) as f:
+                journal = json.load(f)
+        except (OSError, ValueError):
+            return {}
+        if (journal.get("remote") != self.remote or journal.get("size") != self.size
+                or journal.get("mtime") != mtime or journal.get("chunk") != self.chunk_size
+                or not os.path.exists(self.part)):
+            return {}  # the rover's copy changed, start over
+        done = {}
+        self.state = "checking partial file"
+        with open(self.part, "rb") as f:
+            for key, digest in journal.get("done", {}).items():
+                i = int(key)
+                f.seek(i * self.chunk_size)
+                if hashlib.sha256(f.read(self.chunk_len(i))).hexdigest() == digest:
+                    done[i] = digest
+        return done
+
+    def save_journal(self, done, mtime):
+        journal = {"remote": self.remote, "size": self.size, "mtime": mtime,
+                   "chunk": self.chunk_size, "done": done}
+        tmp = self.journal_path + ".tmp"
+        with open(tmp, "w") as f:
+            json.dump(journal, f)
+        os.replace(tmp, self.journal_path)
+
+    def verify(self):
+        status, output = self.pool.check_output(f"sha256sum -- {shlex.quote(self.remote)}", timeout=600)
+        if status != 0:
+            return  # no sha256sum on the rover: the per-chunk checks are all we have
+        remote_hash = output.split()[0] if output.split() else ""
+        digest = hashlib.sha256()
+        with open(self.part, "rb") as f:
+            for block in iter(lambda: f.read(1024 * 1024), b""):
+                digest.update(block)
+        if digest.hexdigest() != remote_hash:
+            # something was corrupted that the chunk journal couldn't see:
+            # forget every chunk so the next transfer() fetches them all again
+            os.remove(self.journal_path)
+            raise ChecksumMismatch("sha256 mismatch with the rover's copy")
@@ -0,0 +1,161 @@
+#!/usr/bin/env python3
+"""
+Capture and replay raw terminal output for the Shell tab
+
+A capture holds the bytes a shell session printed, with their arrival
+times (see bytelog.py). SSHWorker writes the same format when the GUI runs
+with ROVER_SHELL_RECORD=dir; `capture` makes one from any local command
+run in a pty of the Shell tab's size, including `ssh rover@... neofetch`.
+
+`play` pushes a capture through pyte and a Shell tab renderer the way
+SSHWorker and ShellTab do, with frames capped at --fps (0 renders after
+every chunk), and reports time per frame, bytes per second and peak
+memory (max RSS; --trace-memory adds the peak Python heap, but tracemalloc
+slows pyte down several times, so don't compare timings taken with it).
+--renderer none measures pyte alone.
+
+Usage:
+    python3 shell_replay.py capture out.rvlog [--seconds N] -- command [args...]
+    python3 shell_replay.py play in.rvlog [--max-speed] [--renderer native|html|none] [--fps N] [--trace-memory]
+"""
+
+import os
+import resource
+import sys
+import time
+import tracemalloc
+
+from bytelog import ByteLogReader, ByteLogWriter
+
+COLS = 80
+ROWS = 30
+
+def capture(path, argv, seconds=None):
+    import pexpect
+    from pexpect.exceptions import TIMEOUT, EOF
+
+    env = dict(os.environ, TERM="xterm-256color", COLUMNS=str(COLS), LINES=str(ROWS))
+    child = pexpect.spawn(argv[0], argv[1:], dimensions=(ROWS, COLS), env=env)
+    deadline = time.monotonic() + seconds if seconds else None
+    total = 0
+    with ByteLogWriter(path) as log:
+        while True:
+            if deadline and time.monotonic() >= deadline:
+                child.terminate(force=True)
+                break
+            try:
+                data = child.read_nonblocking(size=65536, timeout=0.1)
+            except TIMEOUT:
+                continue
+            except EOF:
+                break
+            log.write(data)
+            total += len(data)
+    print(f"Captured {total} bytes from {' '.join(argv)} to {path}")
+
+def play(path, realtime=True, renderer="native", fps=60, trace_memory=False):
+    os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+    from PySide6.QtWidgets import QApplication
+    from latency import LatencyHistogram
+    from tabs.shellTab import SSHWorker, TerminalView, InteractiveShell
+
+    app = QApplication.instance() or QApplication(sys.argv)
+    if trace_memory:
+        tracemalloc.start()
+    worker = SSHWorker("replay", "replay", max_fps=fps or 1e9)
+    worker.connected = True
+    frames = LatencyHistogram()
+    shell = None
+    if renderer != "none":
+        shell = TerminalView(worker) if renderer == "native" else InteractiveShell(worker)
+        shell.resize(900, 640)
+        shell.show()
+        app.processEvents()
+        paint = shell.viewport() if renderer == "html" else shell
+
+        def render(_text):
+            t0 = time.perf_counter()
+            with worker.lock:
+                shell.refresh(worker.screen)
+            paint.repaint()
+            frames.record(time.perf_counter() - t0)
+
+        worker.output_ready.connect(render)
+
+    total = 0
+    feed_s = 0.0
+    log = ByteLogReader(path)
+    start = time.perf_counter()
+    for t, payload in log:
+        if realtime:
+            wait = start + t - time.perf_counter()
+            if wait > 0:
+                time.sleep(wait)
+        data = bytes(payload)
+        payload.release()  # the log's mmap can't close while slices of it are alive
+        t0 = time.perf_counter()
+        with worker.lock:
+            worker.stream.feed(data)
+        feed_s += time.perf_counter() - t0
+        total += len(data)
+        worker.frame_pending = True
+        worker.emit_frame()
+    worker.next_frame = 0
+    worker.emit_frame()  # the final screen is always shown
+    elapsed = time.perf_counter() - start
+    log.close()
+    peak = None
+    if trace_memory:
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+    if shell is not None:
+        shell.close()
+
+    s = frames.summary()
+    result = {
+        "bytes": total,
+        "seconds": elapsed,
+        "bytes_per_s": total / elapsed if elapsed else 0,
+        "feed_ms": feed_s * 1000,
+        "frames": s["count"],
+        "frame_mean_ms": s["mean"] / 1000,
+        "frame_p99_ms": s["p99"] / 1000,
+        "frame_max_ms": s["max"] / 1000,
+        "peak_py_mb": peak / 1e6 if peak is not None else None,
+        "maxrss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+    }
+    return result
+
+def print_result(path, renderer, r):
+    print(f"{path} ({renderer})")
+    print(f"  {r['bytes']} bytes in {r['seconds']:.3f} s = {r['bytes_per_s'] / 1e3:.1f} kB/s"
+          f"  (pyte feed {r['feed_ms']:.1f} ms)")
+    print(f"  {r['frames']} frames: mean {r['frame_mean_ms']:.2f} ms  p99 {r['frame_p99_ms']:.2f} ms"
+          f"  max {r['frame_max_ms']:.2f} ms")
+    line = f"  max rss {r['maxrss_mb']:.0f} MB"
+    if r["peak_py_mb"] is not None:
+        line += f"  peak python heap {r['peak_py_mb']:.1f} MB"
+    print(line)
+
+def _option(args, name, default):
+    if name in args:
+        return args[args.index(name) + 1]
+    return default
+
+if __name__ == "__main__":
+    if len(sys.argv) < 3 or sys.argv[1] not in ("capture", "play"):
+        print(__doc__)
+        sys.exit(1)
+    if sys.argv[1] == "capture":
+        if "--" not in sys.argv:
+            print(__doc__)
+            sys.exit(1)
+        split = sys.argv.index("--")
+        seconds = _option(sys.argv[:split], "--seconds", None)
+        capture(sys.argv[2], sys.argv[split + 1:], float(seconds) if seconds else None)
+    else:
+        renderer = _option(sys.argv, "--renderer", "native")
+        fps = float(_option(sys.argv, "--fps", 60))
+        result = play(sys.argv[2], realtime="--max-speed" not in sys.argv, renderer=renderer, fps=fps,
+                      trace_memory="--trace-memory" in sys.argv)
+        print_result(sys.argv[2], renderer, result)
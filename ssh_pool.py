@@ -0,0 +1,197 @@
+"""
+Shared paramiko connection to the rover
+
+SSHPool authenticates one SSH transport and runs every one-shot command on
+its own channel of it. After the first login a command costs one channel
+open, not a TCP connect, key exchange, login and shell prompt detection.
+Commands and SFTP sessions share max_channels slots, so together they stay
+under the server's session limit; a session the server refuses anyway is
+retried once another one closes. Command output (stdout and stderr
+combined) is streamed back through Qt signals a batch of whole lines at a
+time as it arrives.
+
+The transport is reconnected on demand if the link dropped, and keepalives
+let a dead link be noticed without waiting for a command to hang. It is
+never closed while it is still up, since other channels are using it.
+"""
+
+import codecs
+import itertools
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import paramiko
+from PySide6.QtCore import QObject, Signal
+
+class _PooledSFTP(paramiko.SFTPClient):
+    """An SFTP session that gives its pool slot back when closed."""
+    release = None
+
+    def close(self):
+        try:
+            super().close()
+        finally:
+            release, self.release = self.release, None
+            if release is not None:
+                release()
+
+class SSHPool(QObject):
+    output = Signal(int, str)    # job id, one or more complete lines
+    finished = Signal(int, int)  # job id, exit status (-1 if it could not run)
+
+    REFUSED_WAIT = 30.0  # how long to keep retrying a session the server refused
+
+    def __init__(self, host, user, password=None, keyfile=None, port=22, max_channels=8, keepalive=15):
+        super().__init__()
+        self.host = host
+        self.user = user
+        self.password = password or None
+        self.keyfile = keyfile
+        self.port = port
+        self.keepalive = keepalive
+        self.client = None
+        self.lock = threading.Lock()
+        self.jobs = itertools.count(1)
+        # OpenSSH allows 10 sessions per connection by default, stay below it;
+        # every open command channel and SFTP session holds a slot
+        self.slots = threading.BoundedSemaphore(max_channels)
+        self.executor = ThreadPoolExecutor(max_workers=max_channels, thread_name_prefix="ssh-pool")
+
+    def transport(self):
+        """The shared authenticated transport, (re)connecting if needed."""
+        with self.lock:
+            transport = self.client.get_transport() if self.client else None
+            if transport is None or not transport.is_active():
+                if self.client:
+                    self.client.close()
+                    self.client = None
+                client = paramiko.SSHClient()
+                client.load_system_host_keys()
+                # same trust as the interactive shell's ssh, but don't refuse unknown keys
+                client.set_missing_host_key_policy(paramiko.WarningPolicy())
+                client.connect(self.host, port=self.port, username=self.user, password=self.password,
+                               key_filename=self.keyfile, timeout=10, banner_timeout=10, auth_timeout=10)
+                transport = client.get_transport()
+                transport.set_keepalive(self.keepalive)
+                self.client = client
+            return transport
+
+    def drop(self):
+        """Forget the current transport, e.g. after it failed mid-use."""
+        with self.lock:
+            if self.client:
+                self.client.close()
+                self.client = None
+
+    def open_channel(self):
+        """A new session channel, holding a slot until close_channel()."""
+        self.slots.acquire()
+        try:
+            return self._open(lambda transport: transport.open_session())
+        except BaseException:
+            self.slots.release()
+            raise
+
+    def close_channel(self, chan):
+        chan.close()
+        self.slots.release()
+
+    def open_sftp(self):
+        """A new SFTP session (its own channel) on the shared transport, holding a slot until closed."""
+        self.slots.acquire()
+        try:
+            sftp = self._open(_PooledSFTP.from_transport)
+        except BaseException:
+            self.slots.release()
+            raise
+        sftp.release = self.slots.release
+        return sftp
+
+    def _open(self, open_on):
+        deadline = time.monotonic() + self.REFUSED_WAIT
+        delay = 0.1
+        reconnected = False
+        while True:
+            transport = self.transport()
+            try:
+                return open_on(transport)
+            except paramiko.SSHException:
+                if not transport.is_active():
+                    # it looked alive but the link had dropped: reconnect, once
+                    if reconnected:
+                        raise
+                    reconnected = True
+                    continue
+                # refused (e.g. MaxSessions) while the transport is fine: wait
+                # for a session to close. With several opens racing paramiko
+                # may report this as a plain SSHException, not ChannelException.
+                if time.monotonic() + delay > deadline:
+                    raise
+                time.sleep(delay)
+                delay = min(delay * 2, 2.0)
+
+    def check_output(self, command, timeout=None):
+        """Run command and wait for it: returns (exit status, output). Not for the GUI thread."""
+        chan = self.open_channel()
+        try:
+            chan.settimeout(timeout)
+            chan.set_combine_stderr(True)
+            chan.exec_command(command)
+            chunks = []
+            while True:
+                data = chan.recv(32768)
+                if not data:
+                    break
+                chunks.append(data)
+            return chan.recv_exit_status(), b"".join(chunks).decode("utf-8", "replace")
+        finally:
+            self.close_channel(chan)
+
+    def run(self, command):
+        """Queue command on its own channel; returns its job id."""
+        job = next(self.jobs)
+        self.executor.submit(self._run, job, command)
+        return job
+
+    def _run(self, job, command):
+        try:
+            chan = self.open_channel()
+        except (paramiko.SSHException, OSError) as e:
+            self.output.emit(job, f"ssh error: {e}")
+            self.finished.emit(job, -1)
+            return
+        try:
+            chan.set_combine_stderr(True)
+            chan.exec_command(command)
+        except (paramiko.SSHException, OSError) as e:
+            self.close_channel(chan)
+            self.output.emit(job, f"ssh error: {e}")
+            self.finished.emit(job, -1)
+            return
+        decoder = codecs.getincrementaldecoder("utf-8")("replace")
+        pending = ""
+        try:
+            while True:
+                data = chan.recv(32768)
+                if not data:
+                    break
+                pending += decoder.decode(data)
+                end = pending.rfind("\n")
+                if end >= 0:
+                    self.output.emit(job, pending[:end].replace("\r", ""))
+                    pending = pending[end + 1:]
+            pending += decoder.decode(b"", final=True)
+            if pending:
+                self.output.emit(job, pending.replace("\r", ""))
+            status = chan.recv_exit_status()
+        except (paramiko.SSHException, OSError) as e:
+            self.output.emit(job, f"ssh error: {e}")
+            status = -1
+        finally:
+            self.close_channel(chan)
+        self.finished.emit(job, status)
+
+    def close(self):
+        self.executor.shutdown(wait=False, cancel_futures=True)
+        self.drop()
@@ -1,6 +1,10 @@
+import os
+import threading
+import time
+
 from PySide6.QtWidgets import *
-from PySide6.QtCore import Qt, QTimer
-from PySide6.QtGui import QImage, QPixmap, QPainter
+from PySide6.QtCore import Qt, QTimer, Signal, QRect
+from PySide6.QtGui import QImage, QPainter, QColor
 
 import gi
 gi.require_version('Gst', '1.0')
@@ -8,81 +12,442 @@ from gi.repository import Gst, GObject, GstVideo
 
 import numpy as np
 
+import latency
+from video_stats import VideoStats, overlay_text
+
 Gst.init(None)
 
+RTP_CAPS = "application/x-rtp, media=video, encoding-name=H264, payload=96"
+BASE_PORT = 5000  # camera i (from 0) streams RTP/H.264 to BASE_PORT + i
+CAMERAS = 6
+
+def camera_branch(port):
+    """Pipeline text from a camera's udpsrc to decoded raw video."""
+    return (
+        f"udpsrc port={port} caps=\"{RTP_CAPS}\" ! "
+        f"rtpjitterbuffer name=jitter{port} latency=0 ! "
+        "rtph264depay ! "
+        f"avdec_h264 name=decode{port} ! "
+    )
+
+def fit_rect(width, height, bounds):
+    """The largest rect of width:height aspect centred in bounds (a QRect)."""
+    scale = min(bounds.width() / width, bounds.height() / height)
+    w, h = round(width * scale), round(height * scale)
+    return QRect(bounds.x() + (bounds.width() - w) // 2, bounds.y() + (bounds.height() - h) // 2, w, h)
+
+def running_time(element):
+    """The pipeline's current running time (ns) as element sees it, or None."""
+    clock = element.get_clock()
+    if clock is None:
+        return None
+    return clock.get_time() - element.get_base_time()
+
 #Video Widget
 class VideoWidget(QWidget):
-    def __init__(self):
+    """
+    Shows the newest decoded frame. The GStreamer streaming thread only
+    swaps the sample into a one-frame slot and asks for a repaint;
+    paintEvent draws straight from the mapped buffer on the GUI thread.
+    Frames that arrive before the last one was painted replace it, so a
+    slow GUI drops frames instead of queueing them.
+
+    The pipeline scales frames to the size they are shown at before
+    converting them to RGB; the size is renegotiated shortly after the
+    widget is resized or the camera's resolution changes.
+
+    Every camera's branch keeps receiving and decoding, and an
+    input-selector picks the one that is shown, so select() switches
+    cameras without a new pipeline or waiting for a keyframe. The time
+    from select() to the new camera's first painted frame is recorded as
+    the "switch->paint" latency stage and reported through switched.
+
+    stats (see video_stats.py) gets a row a second for the shown camera;
+    show_stats draws the latest one over the video.
+    """
+    frame_ready = Signal()
+    source_changed = Signal()
+    switched = Signal(int, float)  # camera index, ms until its first frame was painted
+    RESIZE_DELAY_MS = 200  # renegotiate once a resize has settled
+    NO_VIDEO_S = 0.5  # say so if a selected camera shows nothing for this long
+
+    def __init__(self, cameras=CAMERAS, stats_path=None):
         super().__init__()
         self.setMinimumSize(640, 480)
-        self.pixmap = None
         self.analog = False
-
+        self.cameras = 1 if self.analog else cameras
+        self.camera = 0
+        # [camera, select() time, pts of its first forwarded buffer, that buffer reached the slot]
+        self.switch = None
+
+        self.lock = threading.Lock()  # guards the slot between the streaming thread and the GUI
+        self.sample = None  # newest sample, painted (again) by paintEvent
+        self.paint_pending = False
+        self.frames_in = 0
+        self.frames_painted = 0
+        self.frame_ready.connect(self.update)  # queued: emitted off the GUI thread
+
+        self.scaled_size = None  # size last asked of the scaler
+        self.resize_timer = QTimer(self)
+        self.resize_timer.setSingleShot(True)
+        self.resize_timer.setInterval(self.RESIZE_DELAY_MS)
+        self.resize_timer.timeout.connect(self.apply_size)
+        self.source_changed.connect(self.resize_timer.start)
+
+        self.stats = VideoStats(path=stats_path)
+        self.stats_row = None
+        self.show_stats = False
+        self.decode_started = {}  # pts -> monotonic time it entered the shown camera's decoder
+        self.stats_timer = QTimer(self)
+        self.stats_timer.timeout.connect(self.sample_stats)
+
+        # videoscale before videoconvert: conversion only handles the pixels that are shown.
+        # 4 byte pixels: Qt draws them as RGBX8888 without converting, and rows need no padding.
+        # RGBA, not RGBx: Qt needs that fourth byte to be 255, and only RGBA promises it for video
+        scale = "videoscale name=scale ! capsfilter name=size ! "
         if self.analog:
             # --- Analog camera pipeline ---
             pipeline_desc = (
-                "avfvideosrc device-index=0 ! "
+                "avfvideosrc device-index=0 ! " +
+                scale +
                 "videoconvert ! "
-                "video/x-raw,format=RGB ! "
-                "appsink name=sink emit-signals=True sync=false"
+                "video/x-raw,format=RGBA ! "
+                "appsink name=sink emit-signals=True sync=false max-buffers=1 drop=true"
             )
         else:
-            # --- Digital UDP H264 pipeline ---
+            # --- Digital UDP H264 pipeline, one warm branch per camera ---
+            # sync-streams=false: the unselected branches' frames are dropped right away
             pipeline_desc = (
-                "udpsrc port=5000 caps=\"application/x-rtp, media=video, encoding-name=H264, payload=96\" ! "
-                "rtpjitterbuffer latency=0 ! "
-                "rtph264depay ! "
-                "avdec_h264 ! "
+                "input-selector name=select sync-streams=false ! " +
+                scale +
                 "videoconvert ! "
-                "video/x-raw,format=RGB ! "
-                "appsink name=sink emit-signals=True sync=false"
-            )
+                "video/x-raw,format=RGBA ! "
+                "appsink name=sink emit-signals=True sync=false max-buffers=1 drop=true "
+            ) + " ".join(camera_branch(BASE_PORT + i) + f"select.sink_{i}" for i in range(self.cameras))
 
         self.pipeline = Gst.parse_launch(pipeline_desc)
 
         self.appsink = self.pipeline.get_by_name("sink")
         self.appsink.connect("new-sample", self.on_new_sample)
+        self.size_filter = self.pipeline.get_by_name("size")
+        self.scale_input = self.pipeline.get_by_name("scale").get_static_pad("sink")
+        # a new camera resolution changes the best size too (streaming thread)
+        self.scale_input.connect("notify::caps", lambda pad, param: self.source_changed.emit())
+
+        self.selector = self.pipeline.get_by_name("select")
+        self.selector_pads = []
+        if self.selector is not None:
+            for i in range(self.cameras):
+                pad = self.selector.get_static_pad(f"sink_{i}")
+                pad.add_probe(Gst.PadProbeType.BUFFER, self.on_branch_buffer, i)
+                self.selector_pads.append(pad)
+                decoder = self.pipeline.get_by_name(f"decode{BASE_PORT + i}")
+                decoder.get_static_pad("sink").add_probe(Gst.PadProbeType.BUFFER, self.on_decode_in, i)
+                decoder.get_static_pad("src").add_probe(Gst.PadProbeType.BUFFER, self.on_decode_out, i)
+
+        self.start()
+
+    def select(self, camera):
+        """Show camera (from 0) instead of the current one."""
+        if not self.selector_pads:
+            return
+        camera %= self.cameras
+        t0 = time.monotonic()
+        self.selector.set_property("active-pad", self.selector_pads[camera])
+        # after the switch, so the buffer the probe marks is one that gets through
+        with self.lock:
+            self.camera = camera
+            self.switch = [camera, t0, None, False]
+        QTimer.singleShot(int(self.NO_VIDEO_S * 1000) + 50, self.update)
+        self.update()
+
+    def on_branch_buffer(self, pad, info, camera):
+        # streaming thread of that camera's branch, before the selector
+        with self.lock:
+            switch = self.switch
+            if switch is not None and switch[0] == camera and switch[2] is None:
+                switch[2] = info.get_buffer().pts
+        return Gst.PadProbeReturn.OK
 
+    def start(self):
         self.pipeline.set_state(Gst.State.PLAYING)
+        self.stats_timer.start(1000)
+
+    def stop(self):
+        # NULL, not PAUSED: frees the udp ports for the multicam view
+        self.pipeline.set_state(Gst.State.NULL)
+        self.stats_timer.stop()
+
+    def resizeEvent(self, event):
+        self.resize_timer.start()  # restarts: a drag renegotiates once, at the end
+        super().resizeEvent(event)
+
+    def source_size(self):
+        caps = self.scale_input.get_current_caps()
+        if caps is None:
+            return None
+        structure = caps.get_structure(0)
+        return structure.get_value("width"), structure.get_value("height")
+
+    def apply_size(self):
+        """Ask the scaler for frames the size they will be painted at."""
+        source = self.source_size()
+        if source is None:
+            return  # nothing decoded yet, source_changed will bring us back
+        ratio = self.devicePixelRatioF()
+        bounds = QRect(0, 0, round(self.width() * ratio), round(self.height() * ratio))
+        target = fit_rect(source[0], source[1], bounds)
+        # never scale up before converting, and keep sizes even for 4:2:0 video
+        w = min(target.width(), source[0]) & ~1
+        h = min(target.height(), source[1]) & ~1
+        if (w, h) == self.scaled_size or w < 2 or h < 2:
+            return
+        self.scaled_size = (w, h)
+        # setting the caps makes the scaler renegotiate with the next frame
+        self.size_filter.set_property("caps", Gst.Caps.from_string(
+            f"video/x-raw,width={w},height={h},pixel-aspect-ratio=1/1"))
+
+    def on_decode_in(self, pad, info, camera):
+        if camera == self.camera:
+            if len(self.decode_started) > 64:
+                self.decode_started.clear()  # frames the decoder dropped
+            self.decode_started[info.get_buffer().pts] = time.monotonic()
+        return Gst.PadProbeReturn.OK
+
+    def on_decode_out(self, pad, info, camera):
+        if camera == self.camera:
+            started = self.decode_started.pop(info.get_buffer().pts, None)
+            if started is not None:
+                self.stats.decoded(time.monotonic() - started)
+        return Gst.PadProbeReturn.OK
+
+    def frame_latency(self, pts):
+        """Seconds since the frame's RTP time, mapped to our clock by the jitterbuffer."""
+        now = running_time(self.appsink)
+        if now is None or pts == Gst.CLOCK_TIME_NONE:
+            return None
+        return (now - pts) / Gst.SECOND
+
+    def sample_stats(self):
+        jitter = None
+        element = self.pipeline.get_by_name(f"jitter{BASE_PORT + self.camera}")
+        if element is not None:
+            structure = element.get_property("stats")
+            jitter = {key: structure.get_value(key) for key in ("num-pushed", "num-lost", "num-late", "avg-jitter")}
+        with self.lock:
+            frames = self.frames_in, self.frames_painted
+        self.stats_row = self.stats.sample(self.camera, jitter, *frames)
+        if self.show_stats:
+            self.update()
+
+    def set_show_stats(self, show):
+        self.show_stats = show
+        self.update()
 
     def on_new_sample(self, sink):
+        # streaming thread: no Qt objects here, only the slot
         sample = sink.emit("pull-sample")
-        buf = sample.get_buffer()
-        caps = sample.get_caps()
+        if sample is None:
+            return Gst.FlowReturn.ERROR
+        self.stats.frame_arrived(self.frame_latency(sample.get_buffer().pts))
+        with self.lock:
+            self.sample = sample
+            self.frames_in += 1
+            switch = self.switch
+            if switch is not None and switch[2] is not None and sample.get_buffer().pts == switch[2]:
+                switch[3] = True  # from here on the slot holds the new camera
+            if self.paint_pending:
+                return Gst.FlowReturn.OK  # the pending paint will pick this one up
+            self.paint_pending = True
+        self.frame_ready.emit()
+        return Gst.FlowReturn.OK
 
-        structure = caps.get_structure(0)
+    def paintEvent(self, event):
+        with self.lock:
+            sample = self.sample
+            new_frame = self.paint_pending
+            if self.paint_pending:
+                self.paint_pending = False
+                self.frames_painted += 1
+            switch = self.switch
+            if switch is not None and switch[3]:
+                self.switch = None
+        if switch is not None and switch[3]:
+            elapsed = time.monotonic() - switch[1]
+            latency.record("switch->paint", elapsed)
+            self.switched.emit(switch[0], elapsed * 1000)
+        elif switch is not None and time.monotonic() - switch[1] > self.NO_VIDEO_S:
+            # still showing the previous camera's last frame: don't pass it off as this one
+            painter = QPainter(self)
+            painter.fillRect(self.rect(), Qt.black)
+            painter.setPen(QColor("white"))
+            painter.drawText(self.rect(), Qt.AlignCenter, f"No video from Cam {switch[0] + 1}")
+            self.paint_stats(painter)
+            return
+        if sample is None:
+            if self.show_stats:
+                self.paint_stats(QPainter(self))
+            return
+
+        structure = sample.get_caps().get_structure(0)
         width = structure.get_value("width")
         height = structure.get_value("height")
-
+        buf = sample.get_buffer()
         success, mapinfo = buf.map(Gst.MapFlags.READ)
         if not success:
-            return Gst.FlowReturn.ERROR
-
-        arr = np.frombuffer(mapinfo.data, dtype=np.uint8)
-        arr = arr.reshape((height, width, 3))
+            return
+        try:
+            # wraps the mapped frame, no copy; only used until unmap
+            image = QImage(mapinfo.data, width, height, 4 * width, QImage.Format.Format_RGBX8888)
+            painter = QPainter(self)
+            painter.fillRect(self.rect(), Qt.black)
+            # the frame is already (close to) this size, so this is usually a plain blit
+            painter.drawImage(fit_rect(width, height, self.rect()), image)
+            if new_frame:
+                delay = self.frame_latency(buf.pts)
+                if delay is not None:
+                    self.stats.painted(delay)
+            self.paint_stats(painter)
+            painter.end()
+            del image
+        finally:
+            buf.unmap(mapinfo)
+
+    def paint_stats(self, painter):
+        if not self.show_stats or self.stats_row is None:
+            return
+        text = overlay_text(self.stats_row)
+        box = painter.fontMetrics().boundingRect(self.rect().adjusted(8, 8, -8, -8),
+                                                 Qt.AlignLeft | Qt.AlignTop, text)
+        painter.fillRect(box.adjusted(-4, -4, 4, 4), QColor(0, 0, 0, 160))
+        painter.setPen(QColor("white"))
+        painter.drawText(box, Qt.AlignLeft | Qt.AlignTop, text)
+
+class MulticamWidget(QWidget):
+    """
+    All cameras tiled into one grid. One pipeline holds a branch per camera
+    that scales each decoded frame down to its tile before converting it,
+    so conversion and copying cost tile pixels, not camera pixels. Each
+    branch copies its frame into its tile of one preallocated RGBx canvas,
+    and the canvas is painted at most max_fps times a second however many
+    cameras are sending.
+    """
+    frame_ready = Signal()
+    tile_activated = Signal(int)  # camera index of a double-clicked tile
+    STALE_S = 2.0  # a tile with no frame for this long is marked "no signal"
+
+    def __init__(self, cameras=CAMERAS, columns=3, tile=(480, 270), max_fps=30):
+        super().__init__()
+        self.setMinimumSize(600, 400)
+        self.cameras = cameras
+        self.columns = columns
+        self.tile_w, self.tile_h = tile
+        rows = -(-cameras // columns)
+        self.canvas = np.zeros((rows * self.tile_h, columns * self.tile_w, 4), dtype=np.uint8)
+        self.canvas[:, :, 3] = 255  # opaque, as RGBX8888 requires
+        # the QImage shares the canvas memory; both live as long as the widget
+        self.image = QImage(self.canvas.data, self.canvas.shape[1], self.canvas.shape[0],
+                            self.canvas.strides[0], QImage.Format.Format_RGBX8888)
+        self.last_frame = [0.0] * cameras  # monotonic time of each tile's newest frame
+
+        self.lock = threading.Lock()  # guards canvas between the streaming threads and the GUI
+        self.paint_pending = False
+        self.max_fps = max_fps
+        self.next_frame = 0
+        self.frame_ready.connect(self.schedule_paint)  # queued: emitted off the GUI thread
+        # repaints "no signal" tiles when nothing else would
+        self.stale_timer = QTimer(self)
+        self.stale_timer.timeout.connect(self.update)
+
+        branches = []
+        for i in range(cameras):
+            branches.append(
+                camera_branch(BASE_PORT + i) +
+                "videoscale ! "
+                "videoconvert ! "
+                f"video/x-raw,format=RGBA,width={self.tile_w},height={self.tile_h},pixel-aspect-ratio=1/1 ! "
+                f"appsink name=tile{i} emit-signals=True sync=false max-buffers=1 drop=true"
+            )
+        self.pipeline = Gst.parse_launch(" ".join(branches))
+        for i in range(cameras):
+            self.pipeline.get_by_name(f"tile{i}").connect("new-sample", self.on_new_sample, i)
 
-        image = QImage(
-            arr.data,
-            width,
-            height,
-            3 * width,
-            QImage.Format.Format_RGB888
-        )
+    def start(self):
+        self.pipeline.set_state(Gst.State.PLAYING)
+        self.stale_timer.start(1000)
 
-        self.pixmap = QPixmap.fromImage(image)
-        self.update()
+    def stop(self):
+        self.pipeline.set_state(Gst.State.NULL)
+        self.stale_timer.stop()
 
-        buf.unmap(mapinfo)
+    def mouseDoubleClickEvent(self, event):
+        target = self.target_rect()
+        if not target.contains(event.position().toPoint()):
+            return
+        scale = target.width() / self.image.width()
+        x = int((event.position().x() - target.x()) / scale) // self.tile_w
+        y = int((event.position().y() - target.y()) / scale) // self.tile_h
+        index = y * self.columns + x
+        if index < self.cameras:
+            self.tile_activated.emit(index)
+
+    def tile_origin(self, index):
+        return (index % self.columns) * self.tile_w, (index // self.columns) * self.tile_h
+
+    def on_new_sample(self, sink, index):
+        # streaming thread of camera index
+        sample = sink.emit("pull-sample")
+        if sample is None:
+            return Gst.FlowReturn.ERROR
+        buf = sample.get_buffer()
+        success, mapinfo = buf.map(Gst.MapFlags.READ)
+        if not success:
+            return Gst.FlowReturn.ERROR
+        try:
+            frame = np.frombuffer(mapinfo.data, dtype=np.uint8).reshape(self.tile_h, self.tile_w, 4)
+            x, y = self.tile_origin(index)
+            with self.lock:
+                self.canvas[y:y + self.tile_h, x:x + self.tile_w] = frame
+                self.last_frame[index] = time.monotonic()
+                if self.paint_pending:
+                    return Gst.FlowReturn.OK
+                self.paint_pending = True
+        finally:
+            buf.unmap(mapinfo)
+        self.frame_ready.emit()
         return Gst.FlowReturn.OK
 
-    def paintEvent(self, event):
-        if not self.pixmap:
-            return
+    def schedule_paint(self):
+        delay = max(0, self.next_frame - time.monotonic())
+        QTimer.singleShot(int(delay * 1000), self.update)
+
+    def target_rect(self):
+        return fit_rect(self.image.width(), self.image.height(), self.rect())
 
+    def paintEvent(self, event):
         painter = QPainter(self)
-        painter.drawPixmap(
-            0, 0, self.width(), self.height(), self.pixmap
-        )
+        painter.fillRect(self.rect(), Qt.black)
+        target = self.target_rect()
+        with self.lock:
+            painter.drawImage(target, self.image)
+            self.paint_pending = False
+            last_frame = list(self.last_frame)
+        now = time.monotonic()
+        self.next_frame = now + 1 / self.max_fps
+
+        scale = target.width() / self.image.width()
+        painter.setPen(QColor("white"))
+        for i in range(self.cameras):
+            x, y = self.tile_origin(i)
+            tile = QRect(target.x() + int(x * scale), target.y() + int(y * scale),
+                         int(self.tile_w * scale), int(self.tile_h * scale))
+            painter.drawRect(tile.adjusted(0, 0, -1, -1))
+            painter.drawText(tile.adjusted(6, 4, 0, 0), Qt.AlignLeft | Qt.AlignTop, f"Cam {i + 1}")
+            if now - last_frame[i] > self.STALE_S:
+                painter.drawText(tile, Qt.AlignCenter, "No Signal")
+
+# ROVER_VIDEO_STATS=file.csv appends the camera view's statistics there every second
+stats_path = os.environ.get("ROVER_VIDEO_STATS")
 
 # ---------------------------
 # Camera Tab Implementation
@@ -110,18 +475,35 @@ class CameraTab(QWidget):
         feed_with_nav = QVBoxLayout()
 
         #Camera live feed
-        self.live_feed = VideoWidget()
+        self.live_feed = VideoWidget(stats_path=stats_path)
         feed_with_nav.addWidget(self.live_feed)
 
         # Navigation row (same width as feed)
         nav_row = QHBoxLayout()
         prev_btn = QPushButton("Prev Camera")
         next_btn = QPushButton("Next Camera")
+        prev_btn.clicked.connect(lambda: self.select_camera(self.live_feed.camera - 1))
+        next_btn.clicked.connect(lambda: self.select_camera(self.live_feed.camera + 1))
+        self.camera_label = QLabel("Cam 1")
+        self.camera_label.setAlignment(Qt.AlignCenter)
+        self.live_feed.switched.connect(self.on_camera_switched)
         nav_row.addWidget(prev_btn, alignment=Qt.AlignLeft)
+        nav_row.addWidget(self.camera_label, stretch=1)
         nav_row.addWidget(next_btn, alignment=Qt.AlignRight)
 
         feed_with_nav.addLayout(nav_row)
 
+        # Link / decoder / GUI statistics
+        stats_row = QHBoxLayout()
+        stats_toggle = QCheckBox("Stats overlay")
+        stats_toggle.toggled.connect(self.live_feed.set_show_stats)
+        export_btn = QPushButton("Export Stats...")
+        export_btn.clicked.connect(self.export_stats)
+        stats_row.addWidget(stats_toggle)
+        stats_row.addStretch(1)
+        stats_row.addWidget(export_btn)
+        feed_with_nav.addLayout(stats_row)
+
         single_layout.addLayout(feed_with_nav, stretch=3)
 
         # Right side: camera buttons grid
@@ -130,6 +512,7 @@ class CameraTab(QWidget):
         for i in range(2):
             for j in range(3):
                 btn = QPushButton(f"Cam {i*3 + j + 1}")
+                btn.clicked.connect(lambda checked=False, cam=i*3 + j: self.select_camera(cam))
                 button_grid.addWidget(btn, i, j)
         single_layout.addWidget(button_grid_widget, stretch=1)
 
@@ -139,10 +522,10 @@ class CameraTab(QWidget):
         multicam_view = QWidget()
         multicam_layout = QVBoxLayout(multicam_view)
 
-        self.multicam_feed = QLabel("Multicam Feed")
-        self.multicam_feed.setStyleSheet("background-color: black; color: white; border: 1px solid gray;")
-        self.multicam_feed.setAlignment(Qt.AlignCenter)
-        self.multicam_feed.setMinimumSize(600, 400)
+        # started by toggle_view: it uses the same udp ports as the live feed
+        self.multicam_feed = MulticamWidget()
+        self.multicam_feed.setToolTip("Double-click a camera to open it")
+        self.multicam_feed.tile_activated.connect(self.open_camera)
         multicam_layout.addWidget(self.multicam_feed)
 
         self.stacked_layout.addWidget(multicam_view)
@@ -157,4 +540,29 @@ class CameraTab(QWidget):
     def toggle_view(self):
         """Switch between single and multicam views"""
         current = self.stacked_layout.currentIndex()
-        self.stacked_layout.setCurrentIndex(1 if current == 0 else 0)
\ No newline at end of file
+        # only the shown view's pipeline runs, both need the cameras' udp ports
+        if current == 0:
+            self.live_feed.stop()
+            self.multicam_feed.start()
+        else:
+            self.multicam_feed.stop()
+            self.live_feed.start()
+        self.stacked_layout.setCurrentIndex(1 if current == 0 else 0)
+
+    def select_camera(self, camera):
+        camera %= self.live_feed.cameras
+        self.camera_label.setText(f"Cam {camera + 1}: switching...")
+        self.live_feed.select(camera)
+
+    def on_camera_switched(self, camera, ms):
+        self.camera_label.setText(f"Cam {camera + 1}: first frame after {ms:.0f} ms")
+
+    def open_camera(self, camera):
+        """Single view of camera, from a multicam tile."""
+        self.toggle_view()
+        self.select_camera(camera)
+
+    def export_stats(self):
+        path, _ = QFileDialog.getSaveFileName(self, "Export video statistics", "video_stats.csv", "CSV (*.csv)")
+        if path:
+            self.live_feed.stats.write_csv(path)
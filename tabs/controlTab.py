@@ -2,14 +2,36 @@ from PySide6.QtWidgets import *
 
 from PySide6.QtSvgWidgets import QGraphicsSvgItem
 from PySide6.QtSvg import QSvgRenderer
-from PySide6.QtCore import Qt, QTimer, QThread, Signal, QRectF
-from PySide6.QtGui import QDoubleValidator, QTransform, QPainter
+from PySide6.QtCore import Qt, QTimer, QRectF, QPointF
+from PySide6.QtGui import QDoubleValidator, QTransform, QPainter, QImage
+from collections import deque
+import math
 import numpy as np
 import controller
+import latency
+import teleop
+import usb.core
+from controller_replay import ReplayDevice
 import os
-
-next_scan = 0
-num_controllers = 2
+import time
+
+# ROVER_CONTROLLER_REPLAY=a.rvlog:b.rvlog feeds recorded logs to the controller
+# slots in order; ROVER_CONTROLLER_RECORD=dir records every attached pad.
+replay_logs = [p for p in os.environ.get("ROVER_CONTROLLER_REPLAY", "").split(os.pathsep) if p]
+record_dir = os.environ.get("ROVER_CONTROLLER_RECORD")
+
+# ButtonData field -> button_svgs key, grouped by how the item is redrawn
+PAIR_FIELDS = {"a": "A", "b": "B", "x": "X", "y": "Y"}
+TOGGLE_FIELDS = {
+    "bumper_left": "LB", "bumper_right": "RB",
+    "dpad_up": "up", "dpad_down": "down", "dpad_left": "left", "dpad_right": "right",
+    "start": "start", "back": "back",
+}
+STICK_FIELDS = {
+    "stick_left_x": "LS", "stick_left_y": "LS", "stick_left_click": "LS",
+    "stick_right_x": "RS", "stick_right_y": "RS", "stick_right_click": "RS",
+}
+TRIGGER_FIELDS = {"trigger_left": "LT", "trigger_right": "RT"}
 
 class CroppedSvgItem(QGraphicsSvgItem):
     def __init__(self, filename):
@@ -32,25 +54,170 @@ class CroppedSvgItem(QGraphicsSvgItem):
         else:
             super().paint(painter, option, widget)
 
-class ControllerScanner(QThread):
-    found = Signal(list)  # Emits list of available controllers
+class StickTransformTable:
+    """
+    XboxControllerWidget.joyMat precomputed over a (steps+1)^2 grid of
+    stick positions in [-1, 1], built in one vectorized pass. lookup()
+    snaps to the nearest grid point and returns a ready QTransform.
+    """
+    def __init__(self, amax, joy_dist, cx, cy, steps=128):
+        self.steps = steps
+        g = np.linspace(-1, 1, steps + 1)
+        x, y = np.meshgrid(g, g, indexing="ij")
+        d = np.hypot(x, y)
+        moved = d != 0
+        safe_d = np.where(moved, d, 1)
+        d_sc = np.clip(d, 0, 1)
+        r = 1/np.sin(amax)
+        sx = np.sqrt(1-(d_sc/r)**2)
+        sAng = np.where(moved, -y/safe_d, 0)
+        cAng = np.where(moved, x/safe_d, 1)
+        one = np.ones_like(x)
+        zero = np.zeros_like(x)
+
+        # Same three matrices as joyMat in QTransform's row-vector layout
+        A = np.stack([one, zero, zero, zero, one, zero, -cx*one, -cy*one, one], -1).reshape(x.shape + (3, 3))
+        B = np.stack([cAng, sAng, zero, -sAng, cAng, zero, zero, zero, one], -1).reshape(x.shape + (3, 3))
+        C = np.stack([
+            sx*cAng, -sx*sAng, zero,
+            sAng, cAng, zero,
+            cx + d_sc*cAng*joy_dist, cy - d_sc*sAng*joy_dist, one,
+        ], -1).reshape(x.shape + (3, 3))
+        M = A @ B @ C
+        M[~moved] = np.eye(3)
+
+        coeffs = M[..., :, :2].reshape(-1, 6).tolist()
+        self.transforms = [QTransform(*c) for c in coeffs]
+
+    def lookup(self, x, y):
+        half = self.steps / 2
+        i = min(max(int((x + 1) * half + 0.5), 0), self.steps)
+        j = min(max(int((y + 1) * half + 0.5), 0), self.steps)
+        return self.transforms[i * (self.steps + 1) + j]
+
+_stick_tables = {}
+
+def stick_table(amax, joy_dist, cx, cy):
+    """Shared StickTransformTable for one amax/joy_dist/center setting."""
+    key = (amax, joy_dist, cx, cy)
+    if key not in _stick_tables:
+        _stick_tables[key] = StickTransformTable(amax, joy_dist, cx, cy)
+    return _stick_tables[key]
+
+class TriggerItem(QGraphicsItem):
+    """
+    Trigger art rasterized once per device scale; the pressed fraction is
+    drawn as a slice of that image instead of re-rendering the SVG under a clip.
+    """
+    def __init__(self, filename):
+        super().__init__()
+        self.renderer = QSvgRenderer(filename)
+        self.rect = QRectF(QPointF(0, 0), self.renderer.defaultSize().toSizeF())
+        self.image = None
+        self.image_scale = 0
+        self._crop = None  # QRectF in item-local coordinates
+
+    def boundingRect(self):
+        return self.rect
+
+    def setCropRect(self, rect: QRectF | None):
+        """rect is in the item's local coordinates (before item's transform)."""
+        self._crop = QRectF(rect) if rect is not None else None
+        self.update()  # request repaint
+
+    def rasterize(self, scale):
+        size = (self.rect.size() * scale).toSize()
+        self.image = QImage(size, QImage.Format_ARGB32_Premultiplied)
+        self.image.fill(Qt.transparent)
+        painter = QPainter(self.image)
+        self.renderer.render(painter)
+        painter.end()
+        self.image_scale = scale
+
+    def paint(self, painter: QPainter, option, widget):
+        t = painter.worldTransform()
+        scale = math.hypot(t.m11(), t.m12())
+        if widget is not None:
+            scale *= widget.devicePixelRatioF()
+        if abs(scale - self.image_scale) > 1e-3:
+            self.rasterize(scale)
+        target = self._crop if self._crop is not None else self.rect
+        if target.isEmpty():
+            return
+        source = QRectF(target.x() * scale, target.y() * scale, target.width() * scale, target.height() * scale)
+        painter.drawImage(target, self.image, source)
+
+class TimedGraphicsView(QGraphicsView):
+    """QGraphicsView that records how long each paint takes."""
+    def __init__(self, scene, samples=240):
+        super().__init__(scene)
+        self.frame_times = deque(maxlen=samples)
+        self.pending_read = None  # read time of the oldest unpainted report
+
+    def paintEvent(self, event):
+        start = time.perf_counter()
+        super().paintEvent(event)
+        self.frame_times.append(time.perf_counter() - start)
+        if self.pending_read is not None:
+            latency.since("read->paint", self.pending_read)
+            self.pending_read = None
+
+    def frame_stats(self):
+        """(mean ms, max ms) over the recent paints."""
+        if not self.frame_times:
+            return 0.0, 0.0
+        return 1000 * sum(self.frame_times) / len(self.frame_times), 1000 * max(self.frame_times)
+
+class LatencyDialog(QDialog):
+    """Live view of the latency.STAGES histograms with dump/reset."""
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.setWindowTitle("Input Latency")
+        layout = QVBoxLayout(self)
+
+        self.text = QPlainTextEdit()
+        self.text.setReadOnly(True)
+        self.text.setStyleSheet("font-family: monospace;")
+        self.text.setMinimumSize(640, 200)
+        layout.addWidget(self.text)
+
+        btn_layout = QHBoxLayout()
+        dump_btn = QPushButton("Dump...")
+        dump_btn.clicked.connect(self.on_dump)
+        reset_btn = QPushButton("Reset")
+        reset_btn.clicked.connect(latency.reset_all)
+        btn_layout.addStretch()
+        btn_layout.addWidget(dump_btn)
+        btn_layout.addWidget(reset_btn)
+        layout.addLayout(btn_layout)
+
+        self.timer = QTimer(self)
+        self.timer.timeout.connect(self.refresh)
+        self.timer.start(1000)
+        self.refresh()
+
+    def refresh(self):
+        self.text.setPlainText(latency.summary_text())
 
-    def run(self):
-        avail = controller.find_controllers()
-        self.found.emit(avail)
+    def on_dump(self):
+        path, _ = QFileDialog.getSaveFileName(self, "Dump latency histograms", time.strftime("latency-%Y%m%d-%H%M%S.txt"))
+        if path:
+            latency.dump(path)
 
 class XboxControllerWidget(QWidget):
-    def __init__(self, asset_folder, index):
+    def __init__(self, asset_folder, index, discovery, cached=True):
         super().__init__()
 
-        self.scanner = None
+        self.discovery = discovery
+        self.device_key = None
         self.asset_folder = asset_folder
 
         layout = QVBoxLayout(self)
         layout.setAlignment(Qt.AlignCenter)
 
         self.scene = QGraphicsScene()
-        self.view = QGraphicsView(self.scene)
+        self.view = TimedGraphicsView(self.scene)
+        self.cached = cached
         
         self.joy_dist = 25
         self.cont = None
@@ -71,8 +238,9 @@ class XboxControllerWidget(QWidget):
         self.startback = QSvgRenderer(os.path.join(asset_folder, "start-select.svg"))
 
         self.stick = QSvgRenderer(os.path.join(asset_folder, "stick.svg"))
-        self.ltrigger = CroppedSvgItem(os.path.join(asset_folder, "trigger.svg"))
-        self.rtrigger = CroppedSvgItem(os.path.join(asset_folder, "trigger.svg"))
+        trigger_item = TriggerItem if cached else CroppedSvgItem
+        self.ltrigger = trigger_item(os.path.join(asset_folder, "trigger.svg"))
+        self.rtrigger = trigger_item(os.path.join(asset_folder, "trigger.svg"))
         self.rtrigger.setTransform(QTransform().scale(-1,1))
 
         self.scene.addItem(self.lbumper)
@@ -163,18 +331,27 @@ class XboxControllerWidget(QWidget):
         self.button_svgs["RB"] = self.rbumper
 
         self.amax = np.pi/5.5
+        # build the stick tables now, not on the GUI thread at the first stick event
+        for item in self.button_svgs["LS"] + self.button_svgs["RS"]:
+            stick_table(self.amax, self.joy_dist, item.boundingRect().width() / 2, item.boundingRect().height() / 2)
 
         self.disconnected.setZValue(10)
         self.disconnected.setVisible(True)
 
-        self.scan_timer = QTimer()
-        self.scan_timer.timeout.connect(self.check_controllers)
-        self.scan_timer.start(500)
+        # Fix the scene rect so moving sticks never grow it and refit the view
+        self.scene.setSceneRect(self.scene.itemsBoundingRect())
+        self.scene.setItemIndexMethod(QGraphicsScene.NoIndex)
+        if cached:
+            # Static and toggled art is rasterized once per view scale. Sticks
+            # change transform every frame, so they cache in item coordinates
+            # (sized in update_raster_scale) instead.
+            sticks = self.button_svgs["LS"] + self.button_svgs["RS"]
+            for item in self.scene.items():
+                if item in sticks:
+                    item.setCacheMode(QGraphicsItem.ItemCoordinateCache)
+                elif not isinstance(item, TriggerItem):
+                    item.setCacheMode(QGraphicsItem.DeviceCoordinateCache)
 
-        self.cont_timer = QTimer()
-        self.cont_timer.timeout.connect(self.run_controllers)
-        self.cont_timer.start(30)
-        
         self.view.setHorizontalScrollBarPolicy(Qt.ScrollBarAlwaysOff)
         self.view.setVerticalScrollBarPolicy(Qt.ScrollBarAlwaysOff)
         self.view.setSizePolicy(QSizePolicy.Expanding, QSizePolicy.Expanding)
@@ -184,6 +361,9 @@ class XboxControllerWidget(QWidget):
         self.view.setStyleSheet("background: transparent; border: none;")
         
         self.index = index
+
+        self.discovery.devices_changed.connect(self.update_controller)
+        QTimer.singleShot(0, self.update_controller)
         
     
     def joyMat(self,x,y,cx,cy):
@@ -219,103 +399,119 @@ class XboxControllerWidget(QWidget):
         return M
 
 
-    def run_controllers(self):
-        if self.cont:
-            self.button_svgs["A"][self.cont.button_data.a].setVisible(True)
-            self.button_svgs["A"][not self.cont.button_data.a].setVisible(False)
-
-            self.button_svgs["B"][self.cont.button_data.b].setVisible(True)
-            self.button_svgs["B"][not self.cont.button_data.b].setVisible(False)
-
-            self.button_svgs["X"][self.cont.button_data.x].setVisible(True)
-            self.button_svgs["X"][not self.cont.button_data.x].setVisible(False)
-
-            self.button_svgs["Y"][self.cont.button_data.y].setVisible(True)
-            self.button_svgs["Y"][not self.cont.button_data.y].setVisible(False)
-
-            self.button_svgs["LB"].setVisible(self.cont.button_data.bumper_left)
-            self.button_svgs["RB"].setVisible(self.cont.button_data.bumper_right)
-
-            self.button_svgs["up"].setVisible(self.cont.button_data.dpad_up)
-            self.button_svgs["down"].setVisible(self.cont.button_data.dpad_down)
-            self.button_svgs["left"].setVisible(self.cont.button_data.dpad_left)
-            self.button_svgs["right"].setVisible(self.cont.button_data.dpad_right)
-
-            self.button_svgs["start"].setVisible(self.cont.button_data.start)
-            self.button_svgs["back"].setVisible(self.cont.button_data.back)
-
-            self.button_svgs["LS"][self.cont.button_data.stick_left_click].setVisible(True)
-            lx,ly = self.cont.button_data.stick_left_x/(1<<15),-self.cont.button_data.stick_left_y/(1<<15)
-            #self.button_svgs["LS"][self.cont.button_data.stick_left_click].setPos(145+lx*self.joy_dist,240+ly*self.joy_dist)
-            center_x = self.button_svgs["LS"][self.cont.button_data.stick_left_click].boundingRect().width() / 2
-            center_y = self.button_svgs["LS"][self.cont.button_data.stick_left_click].boundingRect().height() / 2
-            T = QTransform()
-            T.translate(center_x,center_y)
-            T *= self.joyMat(lx,ly,center_x,center_y)
-            T.translate(-center_x,-center_y)
-            self.button_svgs["LS"][self.cont.button_data.stick_left_click].setTransform(T)
-            self.button_svgs["LS"][not self.cont.button_data.stick_left_click].setVisible(False)
-
-            self.button_svgs["RS"][self.cont.button_data.stick_right_click].setVisible(True)
-            rx,ry = self.cont.button_data.stick_right_x/(1<<15),-self.cont.button_data.stick_right_y/(1<<15)
-            #self.button_svgs["RS"][self.cont.button_data.stick_right_click].setPos(431+rx*self.joy_dist,352+ry*self.joy_dist)
-            center_x = self.button_svgs["RS"][self.cont.button_data.stick_right_click].boundingRect().width() / 2
-            center_y = self.button_svgs["RS"][self.cont.button_data.stick_right_click].boundingRect().height() / 2
-            T = QTransform()
-            #T.translate(center_x,center_y)
-            self.button_svgs["RS"][self.cont.button_data.stick_right_click].setTransformOriginPoint(center_x,center_y)
-            T *= self.joyMat(rx,ry,center_x,center_y)
-            #T.translate(-center_x,-center_y)
-            self.button_svgs["RS"][self.cont.button_data.stick_right_click].setTransform(T)
-            self.button_svgs["RS"][not self.cont.button_data.stick_right_click].setVisible(False)
-
-            tw = 88.934
-            th = 121.795
-            lamt = float(self.cont.button_data.trigger_left/(1<<10))
-            self.button_svgs["LT"].setCropRect(QRectF(0,th-th*lamt,tw,th*lamt))
-
-            ramt = float(self.cont.button_data.trigger_right/(1<<10))
-            self.button_svgs["RT"].setCropRect(QRectF(0,th-th*ramt,tw,th*ramt))
-
-    def scan_controllers(self):
-        global next_scan
-        if next_scan != self.index:
-            return
-        next_scan = -1
-        self.scanner = ControllerScanner()
-        self.scanner.found.connect(self.update_controller)
-        self.scanner.finished.connect(self.scan_finished)
-        self.scanner.start() 
-
-    def scan_finished(self):
-        global next_scan, num_controllers
-        self.scanner = None
-        next_scan = (self.index + 1) % num_controllers
-
-    def check_controllers(self):
-        if self.cont is None or (self.cont.started and not self.cont.connected):
-            # Start a background scan
-            self.scan_controllers()
+    def attach_controller(self, cont):
+        """Show a freshly connected controller and follow its change events."""
+        self.cont = cont
+        if record_dir:
+            stamp = time.strftime("%Y%m%d-%H%M%S")
+            cont.start_recording(os.path.join(record_dir, f"controller{self.index + 1}-{stamp}.rvlog"))
+        # connect first: a change emitted before the snapshot is queued and
+        # replayed after it, in order, instead of being lost
+        self.cont.events.changed.connect(self.apply_changes)
+        self.cont.events.disconnected.connect(self.detach_controller)
+        self.state = cont.snapshot()
+        self.apply_changes(self.state)
+
+    def apply_changes(self, changes, t_read=None):
+        """
+        Update only the scene items affected by the changed report fields.
+        t_read is the perf_counter() time the report was read, if known.
+        """
+        self.state.update(changes)
+        sticks = set()
+        for field in changes:
+            if field in PAIR_FIELDS:
+                pressed = self.state[field]
+                self.button_svgs[PAIR_FIELDS[field]][pressed].setVisible(True)
+                self.button_svgs[PAIR_FIELDS[field]][not pressed].setVisible(False)
+            elif field in TOGGLE_FIELDS:
+                self.button_svgs[TOGGLE_FIELDS[field]].setVisible(self.state[field])
+            elif field in TRIGGER_FIELDS:
+                self.update_trigger(TRIGGER_FIELDS[field], self.state[field])
+            elif field in STICK_FIELDS:
+                sticks.add(STICK_FIELDS[field])
+        for stick in sticks:
+            self.update_stick(stick)
+        if t_read is not None:
+            latency.since("read->gui", t_read)
+            if self.view.pending_read is None:
+                self.view.pending_read = t_read
+
+    def update_stick(self, stick):
+        side = "left" if stick == "LS" else "right"
+        pressed = self.state[f"stick_{side}_click"]
+        x = self.state[f"stick_{side}_x"]/(1<<15)
+        y = -self.state[f"stick_{side}_y"]/(1<<15)
+        item = self.button_svgs[stick][pressed]
+        center_x = item.boundingRect().width() / 2
+        center_y = item.boundingRect().height() / 2
+        table = stick_table(self.amax, self.joy_dist, center_x, center_y)
+        item.setTransform(table.lookup(x, y))
+        item.setVisible(True)
+        self.button_svgs[stick][not pressed].setVisible(False)
+
+    def update_trigger(self, trigger, value):
+        tw = 88.934
+        th = 121.795
+        amt = float(value/(1<<10))
+        self.button_svgs[trigger].setCropRect(QRectF(0,th-th*amt,tw,th*amt))
+
+    def fit_view(self):
+        self.view.fitInView(self.scene.sceneRect(), Qt.KeepAspectRatio)
+        if self.cached:
+            self.update_raster_scale()
+
+    def update_raster_scale(self):
+        """Size the stick caches for the current view scale and pixel ratio."""
+        scale = self.view.transform().m11() * self.view.devicePixelRatioF()
+        for item in self.button_svgs["LS"] + self.button_svgs["RS"]:
+            size = (item.boundingRect().size() * scale).toSize()
+            item.setCacheMode(QGraphicsItem.ItemCoordinateCache, size)
 
     def resizeEvent(self, event):
         super().resizeEvent(event)
         # Scale scene to fit the view every time
-        self.view.fitInView(self.scene.sceneRect(), Qt.KeepAspectRatio)
+        self.fit_view()
         
     def showEvent(self, event):
         super().showEvent(event)
         # ensure fitInView is applied once the widget is actually shown
-        QTimer.singleShot(0, lambda: self.view.fitInView(self.scene.sceneRect(), Qt.KeepAspectRatio))
+        QTimer.singleShot(0, self.fit_view)
         
-    def update_controller(self, avail):
+    def update_controller(self):
         """
-        Scan for controllers and update button overlays when buttons are pressed.
+        Claim a pad from the discovery service if this slot has none.
         """
-        try:
-            self.cont = controller.PowerAController(avail[self.index])
+        if self.cont is not None:
+            return
+        if self.index < len(replay_logs):
+            dev = ReplayDevice(replay_logs[self.index], loop=True)
+            self.attach_controller(controller.PowerAController(dev.idProduct, dev=dev))
             self.disconnected.setVisible(False)
-        except IndexError as e:
-            self.disconnected.setVisible(True)
+            return
+        key, dev = self.discovery.claim()
+        if key is None:
+            return
+        try:
+            self.attach_controller(controller.PowerAController(dev.idProduct, dev=dev))
+        except usb.core.USBError:
+            # device went away between the scan and the claim; don't come
+            # back here unless the rescan finds the list really changed
+            self.discovery.release(key)
+            self.discovery.request_rescan(notify=False)
+            return
+        self.device_key = key
+        self.disconnected.setVisible(False)
+
+    def detach_controller(self):
+        self.cont = None
+        self.disconnected.setVisible(True)
+        if self.device_key is not None:
+            self.discovery.release(self.device_key)
+            self.device_key = None
+        # the pad may still be attached after a transient error; the rescan's
+        # devices_changed lets us claim again, from the updated list
+        self.discovery.request_rescan()
                 
                 
 # ---------------------------
@@ -331,23 +527,29 @@ class ControlTab(QWidget):
         button_layout = QHBoxLayout()
         self.start_btn = QPushButton("Start Rover")
         self.stop_btn = QPushButton("Stop Rover")
+        self.latency_btn = QPushButton("Latency")
+        self.latency_btn.clicked.connect(self.show_latency)
         button_layout.addWidget(self.start_btn)
         button_layout.addWidget(self.stop_btn)
         button_layout.addStretch()
+        button_layout.addWidget(self.latency_btn)
         main_layout.addLayout(button_layout)
 
-        # --- Controller placeholders ---
-        controllers_layout = QHBoxLayout()
-        self.controller1 = QGroupBox("Controller 1")
-        self.controller2 = QGroupBox("Controller 2")
-        # Simple placeholder content
-        c1_layout = QVBoxLayout(self.controller1)
-        c1_layout.addWidget(XboxControllerWidget("xbox-one",0), alignment=Qt.AlignCenter)
-        c2_layout = QVBoxLayout(self.controller2)
-        c2_layout.addWidget(XboxControllerWidget("xbox-one",1), alignment=Qt.AlignCenter)
-        controllers_layout.addWidget(self.controller1, stretch=1)
-        controllers_layout.addWidget(self.controller2, stretch=1)
-        main_layout.addLayout(controllers_layout)
+        # --- Controller slots ---
+        # one slot per attached pad, at least two for drive and arm
+        self.controllers_layout = QGridLayout()
+        self.discovery = controller.ControllerDiscovery()
+        self.controller_boxes = []
+        self.controller_widgets = []
+        for _ in range(max(2, len(replay_logs))):
+            self.add_controller_slot()
+        self.discovery.devices_changed.connect(self.on_devices_changed)
+        main_layout.addLayout(self.controllers_layout)
+
+        # Controller 1 drives, controller 2 runs the arm
+        self.teleop = teleop.TeleopSender()
+        self.teleop.bind(teleop.KIND_DRIVE, lambda: self.controller_widgets[0].cont, teleop.drive_command)
+        self.teleop.bind(teleop.KIND_ARM, lambda: self.controller_widgets[1].cont, teleop.arm_command)
 
         # --- Bottom Row: Arm Control & Drive Control ---
         bottom_layout = QHBoxLayout()
@@ -362,6 +564,20 @@ class ControlTab(QWidget):
 
         main_layout.addLayout(bottom_layout)
 
+    def add_controller_slot(self):
+        index = len(self.controller_widgets)
+        box = QGroupBox(f"Controller {index + 1}")
+        widget = XboxControllerWidget("xbox-one", index, self.discovery)
+        QVBoxLayout(box).addWidget(widget, alignment=Qt.AlignCenter)
+        self.controllers_layout.addWidget(box, index // 2, index % 2)
+        self.controller_boxes.append(box)
+        self.controller_widgets.append(widget)
+
+    def on_devices_changed(self):
+        # grow the grid when more pads are plugged in than there are slots
+        while len(self.controller_widgets) < len(self.discovery.devices):
+            self.add_controller_slot()
+
     def create_arm_panel(self):
         panel = QGroupBox("Arm Control (Individual Motor + End Effector IK Control)")
         layout = QVBoxLayout(panel)
@@ -507,6 +723,14 @@ class ControlTab(QWidget):
 
         # Play / Stop buttons with standard icons
         btn_layout = QHBoxLayout()
+        self.rate_spin = QSpinBox()
+        self.rate_spin.setRange(10, 100)
+        self.rate_spin.setValue(self.teleop.rate_hz)
+        self.rate_spin.setSuffix(" Hz")
+        self.rate_spin.setToolTip("Teleop command rate")
+        self.rate_spin.valueChanged.connect(self.on_rate_changed)
+        btn_layout.addWidget(QLabel("Teleop rate"))
+        btn_layout.addWidget(self.rate_spin)
         play_icon = self.style().standardIcon(QStyle.SP_MediaPlay)
         stop_icon = self.style().standardIcon(QStyle.SP_MediaStop)
         self.play_btn = QPushButton()
@@ -522,12 +746,20 @@ class ControlTab(QWidget):
 
         return panel
 
+    def show_latency(self):
+        if not hasattr(self, "latency_dialog"):
+            self.latency_dialog = LatencyDialog(self)
+        self.latency_dialog.show()
+        self.latency_dialog.raise_()
+
+    def on_rate_changed(self, rate):
+        self.teleop.rate_hz = rate
+
     def on_drive_play(self):
-        # Collect targets and "start" drive control
-        targets = [edit.text().strip() for edit in self.target_fields]
-        print("[Drive] Play - targets:", targets)
-        # TODO: send to backend
+        # Start streaming controller commands to the rover
+        print(f"[Drive] Play - teleop at {self.teleop.rate_hz} Hz to {self.teleop.addr}")
+        self.teleop.start()
 
     def on_drive_stop(self):
         print("[Drive] Stop")
-        # TODO: send stop command to backend
\ No newline at end of file
+        self.teleop.stop()
\ No newline at end of file
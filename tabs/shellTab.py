@@ -1,47 +1,128 @@
+import base64
+import hashlib
+import html
+import math
+import os
+import random
+import selectors
+import shlex
 import sys
 import threading
-from PySide6.QtWidgets import QTextEdit, QWidget, QVBoxLayout, QSplitter, QLineEdit
-from PySide6.QtCore import Signal, QObject, Qt
-from PySide6.QtGui import QTextCursor, QTextCharFormat, QColor, QFont
+import time
+from collections import deque
+from PySide6.QtWidgets import (QTextEdit, QWidget, QVBoxLayout, QHBoxLayout, QSplitter, QLineEdit, QLabel, QApplication,
+                               QGroupBox, QPushButton, QTableWidget, QTableWidgetItem, QHeaderView, QProgressBar,
+                               QFileDialog, QMenu)
+from PySide6.QtCore import Signal, QObject, Qt, QPointF, QRectF, QSize, QTimer
+from PySide6.QtGui import (QTextCursor, QTextCharFormat, QColor, QFont, QFontMetricsF, QImage, QPainter, QShortcut,
+                           QKeySequence, QClipboard)
 from pexpect import pxssh
 import pyte
 from pexpect.exceptions import TIMEOUT, EOF
 
-def render_pyte_screen_as_html(screen):
-    html_lines = ["" for i in range(len(screen.buffer.items()))]
-    for y, row in screen.buffer.items():        # row = dict of column -> Char
-        line_html = ""
-        for x in range(screen.columns):
-            char = row.get(x)
-            if char is None:
-                line_html += "&nbsp;"
-            else:
-                #print(type(char))
-                text = char.data.replace(" ", "&nbsp;")
-                style = []
-                if char.fg:
-                    color = "white" if char.fg == "default" else char.fg
-                    style.append(f"color:{color}")
-                if char.bg:
-                    color = "black" if char.bg == "default" else char.bg
-                    style.append(f"background-color:{color}")
-                if char.bold:
-                    style.append("font-weight:bold")
-                if char.underscore:
-                    style.append("text-decoration:underline")
-                if style:
-                    line_html += f"<span style='{';'.join(style)}'>{text}</span>"
-                else:
-                    line_html += text
-        html_lines[y] = line_html
+from bytelog import ByteLogWriter
+from scrollback import ScrollbackScreen
+from sftp_transfer import Download
+from ssh_pool import SSHPool
+
+_html_styles = {}
+
+def _html_style(key):
+    """Inline CSS for a (fg, bg, bold, underscore) run, built once per distinct key."""
+    style = _html_styles.get(key)
+    if style is None:
+        fg, bg, bold, underscore = key
+        parts = []
+        if fg:
+            parts.append(f"color:{_css_color(fg, 'white')}")
+        if bg:
+            parts.append(f"background-color:{_css_color(bg, 'black')}")
+        if bold:
+            parts.append("font-weight:bold")
+        if underscore:
+            parts.append("text-decoration:underline")
+        style = _html_styles[key] = ";".join(parts)
+    return style
+
+def _css_color(name, default):
+    if name == "default":
+        return default
+    # pyte gives 256-colour and true-colour values as bare hex
+    if len(name) == 6 and all(c in "0123456789abcdefABCDEF" for c in name):
+        return "#" + name
+    return name
+
+def render_pyte_row_as_html(screen, y):
+    """
+    One screen row as HTML, one <span> per run of cells sharing
+    (fg, bg, bold, underscore) rather than one per styled character.
+    """
+    row = screen.buffer[y]        # row = dict of column -> Char
+    parts = []
+    run = []
+    run_key = None  # None: empty cells, which need no span
+    for x in range(screen.columns):
+        char = row.get(x)
+        if char is None:
+            key, text = None, " "
+        else:
+            key, text = (char.fg, char.bg, char.bold, char.underscore), char.data
+        if key != run_key:
+            if run:
+                parts.append(_html_run(run_key, run))
+            run = []
+            run_key = key
+        run.append(text)
+    if run:
+        parts.append(_html_run(run_key, run))
+    return "".join(parts)
 
-    return "<br>".join(html_lines)
+def _html_run(key, run):
+    text = html.escape("".join(run), quote=False).replace(" ", "&nbsp;")
+    style = _html_style(key) if key is not None else ""
+    if style:
+        return f"<span style='{style}'>{text}</span>"
+    return text
+
+def render_pyte_screen_as_html(screen):
+    return "<br>".join(render_pyte_row_as_html(screen, y) for y in range(screen.lines))
 
 # Worker: runs SSH in background and feeds output to pyte screen
+BRACKETED_PASTE = 2004 << 5  # DECSET ?2004, the way pyte stores private modes
+
+class _Input:
+    """A piece of input waiting for the pty (see SSHWorker.queue_input)."""
+    __slots__ = ("data", "sent", "abort", "label", "after", "deadline")
+
+    def __init__(self, data, abort=None, label=None, after=None):
+        self.data = data
+        self.sent = 0
+        self.abort = abort  # bytes to send instead of the rest if cut short
+        self.label = label
+        self.after = after  # held until this appears in the output; b"" once it has
+        self.deadline = None
+
+    @property
+    def started(self):
+        return self.sent > 0 or self.after == b""
+
 class SSHWorker(QObject):
     output_ready = Signal(str)  # emits HTML or text for display
+    state_changed = Signal(str)  # connection state, for the log
+    input_sent = Signal(str, bool)  # label of a paste or upload, False if it was cut short
 
-    def __init__(self, host, user, password="", keyfile=None, cols=80, rows=24):
+    READ_SIZE = 65536  # read_nonblocking drains everything ready, up to this
+    # input is written between reads at most this much at a time, and only
+    # as fast as ssh takes it from the pty
+    WRITE_CHUNK = 4096
+    # reconnect delay doubles per failed attempt, with jitter, up to BACKOFF_MAX
+    BACKOFF_BASE = 0.5
+    BACKOFF_MAX = 30.0
+    # input held for an acknowledgement is dropped if none comes in this long
+    ACK_TIMEOUT = 15.0
+
+    def __init__(self, host, user, password="", keyfile=None, cols=80, rows=24, max_fps=60, history=10000,
+                 record_dir=None):
         super().__init__()
         self.host = host
         self.user = user
@@ -52,76 +133,381 @@ class SSHWorker(QObject):
         
         self.cols = 80
         self.rows = 30
-        self.screen = pyte.Screen(self.cols, self.rows)
+        # lines scrolled off the top are kept, up to history lines
+        self.screen = ScrollbackScreen(self.cols, self.rows, history)
         
         self.fail_screen = pyte.Screen(self.cols, self.rows)
-        self.fail_screen.buffer[0][0] = pyte.screens.Char('No SSH Connection', fg='red', bg='black', bold=True)
+        pyte.Stream(self.fail_screen).feed("\x1b[1;31;40mNo SSH Connection")
         
         self.stream = pyte.ByteStream()
         self.stream.attach(self.screen)
         self.connected = False
+        self.lock = threading.Lock()  # guards screen between the SSH thread and the GUI
+        # screen updates are coalesced into at most max_fps notifications a second
+        self.max_fps = max_fps
+        self.next_frame = 0
+        self.frame_pending = False
+
+        # record_dir: save each session's raw output there (see bytelog.py, shell_replay.py)
+        self.record_dir = record_dir
+        self.recorder = None
+
+        self.state = "disconnected"
+        self.attempts = 0  # failed attempts since the last good connection
+        self._wake = threading.Event()  # interrupts the backoff sleep
+        self._wake_r, self._wake_w = os.pipe()  # interrupts the reader's select
+        os.set_blocking(self._wake_w, False)
+
+        # input waiting for the pty, as _Input
+        self.outbox = deque()
+        self.out_lock = threading.Lock()
+        self.ack_tail = b""  # end of the output so far, for a marker split across reads
 
     def start(self):
-        def run():
-            while self.running:
-                if not self.connected:
-                    print("trying connection...")
-                    self.session = pxssh.pxssh()
-                    try:
-                        self.session.login(self.host, self.user, password=self.password, auto_prompt_reset=False)
-                    except pxssh.ExceptionPxssh as e:
-                        print("connection failed",e)
-                        self.connected = False
-                        self.output_ready.emit("[SSH Login Failed]\n")
-                        continue
-                        
-                    self.session.PROMPT = r"rover\@rover-jetson"  # custom prompt regex
-                    self.session.send("\r")
-                    success = self.session.prompt(timeout=5)
-                    if success:
-                        self.session.send("clear;neofetch\r")
-                        self.output_ready.emit("[Connected to SSH]\n")
-                        self.connected = True
-                    else:
-                        print("connection failed")
-                        self.output_ready.emit("[SSH Login Failed]\n")
-                        continue
-                else:
-                    try:
-                        data = self.session.read_nonblocking(size=1024, timeout=0.01)
-                        if data:
-                            # Feed raw SSH data into pyte for terminal emulation
-                            #print(type(decoded))
-                            self.stream.feed(data)
-                            # Render screen buffer into a single string
-                            #print(type(self.screen.display))
-                            screen_text = "\n".join(self.screen.display)
-                            self.output_ready.emit(screen_text)
-                    except pxssh.ExceptionPxssh:
-                        self.connected = False
-                        self.output_ready.emit("[SSH Disconnected]\n")
-                        continue
-                    except EOF:
-                        self.connected = False
-                        self.output_ready.emit("[SSH Disconnected]\n")
-                        continue
-                    except TIMEOUT:
+        threading.Thread(target=self.run, daemon=True).start()
+
+    def set_state(self, state):
+        self.state = state
+        self.state_changed.emit(state)
+
+    def backoff_delay(self):
+        cap = min(self.BACKOFF_MAX, self.BACKOFF_BASE * 2 ** (self.attempts - 1))
+        # equal jitter: never retry instantly, and spread out retries from several clients
+        return cap / 2 + random.uniform(0, cap / 2)
+
+    def run(self):
+        while self.running:
+            if not self.connected:
+                if self.attempts:
+                    delay = self.backoff_delay()
+                    self.set_state(f"retrying in {delay:.1f} s (retry {self.attempts})")
+                    if self._wake.wait(delay):
                         continue
-                    except Exception as e:
-                        print(e)
+                self.login()
+            else:
+                self.read_loop()
+        self.set_state("stopped")
+
+    def login(self):
+        self.set_state("connecting")
+        session = pxssh.pxssh()
+        try:
+            session.login(self.host, self.user, password=self.password, auto_prompt_reset=False)
+            session.PROMPT = r"rover\@rover-jetson"  # custom prompt regex
+            session.send("\r")
+            success = session.prompt(timeout=5)
+        except (pxssh.ExceptionPxssh, EOF, TIMEOUT) as e:
+            print("connection failed", e)
+            success = False
+        if not success:
+            session.close()
+            self.attempts += 1
+            self.set_state("login failed")
+            self.output_ready.emit("[SSH Login Failed]\n")
+            return
+        if self.record_dir:
+            stamp = time.strftime("%Y%m%d-%H%M%S")
+            self.start_recording(os.path.join(self.record_dir, f"shell-{stamp}.rvlog"))
+        session.send("clear;neofetch\r")
+        self.session = session
+        self.attempts = 0
+        self.connected = True
+        self.set_state("connected")
+        self.output_ready.emit("[Connected to SSH]\n")
+
+    def read_loop(self):
+        """
+        Block on the ssh pty until output arrives, a frame is due or stop()
+        is called; an idle shell does not wake up at all.
+        """
+        fd = self.session.child_fd
+        # writes must not block: ssh stops reading the pty while its channel window is full
+        os.set_blocking(fd, False)
+        sel = selectors.DefaultSelector()
+        events = selectors.EVENT_READ
+        sel.register(fd, events)
+        sel.register(self._wake_r, selectors.EVENT_READ)
+        try:
+            while self.running and self.connected:
+                held = self.held_until()
+                writable = self.outbox and held is None
+                wanted = selectors.EVENT_READ | (selectors.EVENT_WRITE if writable else 0)
+                if wanted != events:
+                    sel.modify(fd, wanted)
+                    events = wanted
+                timeout = None
+                if self.frame_pending:
+                    timeout = max(0, self.next_frame - time.monotonic())
+                if held is not None:
+                    wait = max(0, held - time.monotonic())
+                    timeout = wait if timeout is None else min(timeout, wait)
+                for key, mask in sel.select(timeout):
+                    if key.fd == self._wake_r:
+                        os.read(self._wake_r, 512)
                         continue
+                    if mask & selectors.EVENT_READ:
+                        self.read_available()
+                    if mask & selectors.EVENT_WRITE and self.connected:
+                        self.write_pending()
+                self.emit_frame()
+        finally:
+            sel.close()
 
-        threading.Thread(target=run, daemon=True).start()
+    def read_available(self):
+        try:
+            data = self.session.read_nonblocking(size=self.READ_SIZE, timeout=0)
+        except TIMEOUT:
+            return
+        except (EOF, pxssh.ExceptionPxssh, OSError):
+            self.connected = False
+            self.session.close()
+            with self.out_lock:
+                self.drop_input()
+            self.stop_recording()
+            # back off even before the first retry so a flapping link is not hammered
+            self.attempts = 1
+            self.set_state("disconnected")
+            self.output_ready.emit("[SSH Disconnected]\n")
+            return
+        if self.recorder is not None:
+            self.recorder.write(data)
+        # Feed raw SSH data into pyte for terminal emulation
+        with self.lock:
+            self.stream.feed(data)
+        self.frame_pending = True
+        if self.outbox:
+            self.check_ack(data)
+
+    def start_recording(self, path):
+        """Log every chunk of raw session output to path (see bytelog.py)."""
+        self.recorder = ByteLogWriter(path)
+
+    def stop_recording(self):
+        recorder, self.recorder = self.recorder, None
+        if recorder is not None:
+            recorder.close()
+
+    def emit_frame(self):
+        """Tell the view to repaint if the screen changed and a frame is due."""
+        now = time.monotonic()
+        if not self.frame_pending or now < self.next_frame:
+            return
+        self.frame_pending = False
+        self.next_frame = max(self.next_frame + 1 / self.max_fps, now)
+        # the view renders straight from the screen's dirty rows
+        self.output_ready.emit("")
 
     def send_input(self, text):
-        if self.session and self.connected:
-            self.session.send(text)
+        if text == "\x03":
+            self.interrupt()
+        else:
+            self.queue_input(text.encode())
+
+    def paste(self, text):
+        """Send pasted text, bracketed if the remote program turned on bracketed paste."""
+        data = text.replace("\r\n", "\r").replace("\n", "\r").encode()
+        with self.lock:
+            bracketed = BRACKETED_PASTE in self.screen.mode
+        if not bracketed:
+            self.queue_input(data, label="paste" if len(data) > self.WRITE_CHUNK else None)
+            return
+        # a pasted end marker would let the rest run as typed commands
+        data = data.replace(b"\x1b[201~", b"")
+        self.queue_input(b"\x1b[200~" + data + b"\x1b[201~", abort=b"\x1b[201~\x03",
+                         label="paste" if len(data) > self.WRITE_CHUNK else None)
+
+    def upload(self, path):
+        """
+        Copy a local file to the shell's working directory under the same
+        name, by typing it in as base64. Works wherever the shell is (sudo -i,
+        a nested ssh). The remote starts `head -c N` on the tty with echo off
+        and says so, and only then is the file sent, so none of it is echoed
+        or taken as commands. It is checked against our sha256 before it
+        replaces name; a cut-short upload leaves nothing behind.
+        """
+        with open(path, "rb") as f:
+            data = f.read()
+        body = base64.encodebytes(data)
+        digest = hashlib.sha256(data).hexdigest()
+        token = os.urandom(4).hex()
+        base = os.path.basename(path)
+        name, part = shlex.quote(base), shlex.quote(base + ".part")
+        # the marker as printed differs from the command line as echoed
+        command = (f"stty -echo; printf 'ROVER_%s_READY\\n' {token}; head -c {len(body)} | base64 -d > {part}; "
+                   f"stty echo; if echo '{digest}  '{part} | sha256sum -c --status; "
+                   f"then mv -f -- {part} {name}; printf '%s: upload ok\\n' {name}; "
+                   f"else rm -f -- {part}; printf '%s: upload failed\\n' {name}; fi\r")
+        self.queue_input(command.encode())
+        # cut short: end head's input early (a new line, then EOF) rather than
+        # ^C, which would skip the stty echo after it
+        self.queue_input(body, abort=b"\n\x04", label=base, after=f"ROVER_{token}_READY".encode())
+
+    def queue_input(self, data, abort=None, label=None, after=None):
+        """
+        Queue data for the shell. With after, it is held until those bytes
+        show up in the output, or dropped after ACK_TIMEOUT.
+        """
+        if not (self.session and self.connected) or not data:
+            return
+        with self.out_lock:
+            self.outbox.append(_Input(data, abort, label, after))
+        self.poke()
+
+    def held_until(self):
+        """
+        When the input at the head of the queue gives up waiting, or None if
+        it isn't waiting; input that has waited ACK_TIMEOUT is dropped.
+        """
+        with self.out_lock:
+            while self.outbox and self.outbox[0].after:
+                item = self.outbox[0]
+                now = time.monotonic()
+                if item.deadline is None:
+                    item.deadline = now + self.ACK_TIMEOUT
+                if now < item.deadline:
+                    return item.deadline
+                self.outbox.popleft()
+                if item.label:
+                    self.input_sent.emit(item.label, False)
+        return None
+
+    def check_ack(self, data):
+        """Release the input at the head of the queue once what it waits for was printed."""
+        with self.out_lock:
+            if not self.outbox or not self.outbox[0].after:
+                self.ack_tail = b""
+                return
+            item = self.outbox[0]
+            seen = self.ack_tail + data
+            if item.after in seen:
+                item.after = b""
+                self.ack_tail = b""
+            else:
+                self.ack_tail = seen[-(len(item.after) - 1):]
+
+    def write_pending(self):
+        """Write the next piece of queued input, as much as the pty will take."""
+        with self.out_lock:
+            while self.outbox:
+                item = self.outbox[0]
+                if item.after:
+                    return
+                try:
+                    n = os.write(self.session.child_fd, item.data[item.sent:item.sent + self.WRITE_CHUNK])
+                except BlockingIOError:
+                    return
+                except OSError:
+                    return  # the read side notices the hangup
+                item.sent += n
+                if item.sent < len(item.data):
+                    return
+                self.outbox.popleft()
+                if item.label:
+                    self.input_sent.emit(item.label, True)
+
+    def interrupt(self):
+        """^C, dropping any paste or upload still waiting to go out."""
+        if not (self.session and self.connected):
+            return  # would otherwise go out as the next session's first input
+        with self.out_lock:
+            item = self.outbox[0] if self.outbox else None
+            abort = _Input(b"\x03")
+            if item and item.abort and item.started:
+                abort = _Input(item.abort)  # close what was half sent first
+            elif item and item.abort and item.after:
+                # the remote is about to read it: wait for that, then send the abort instead
+                abort = _Input(item.abort, after=item.after)
+                abort.deadline = item.deadline
+            self.drop_input()
+            self.outbox.append(abort)
+        self.poke()
+
+    def drop_input(self):
+        for item in self.outbox:
+            if item.label:
+                self.input_sent.emit(item.label, False)
+        self.outbox.clear()
+
+    def poke(self):
+        """Wake the reader thread."""
+        try:
+            os.write(self._wake_w, b"\0")
+        except BlockingIOError:
+            pass  # already plenty of wakeups pending
 
     def stop(self):
         self.running = False
-        if self.session:
+        self._wake.set()
+        self.poke()
+        self.stop_recording()
+        if self.session and self.connected:
             self.session.logout()
 
+def key_input(event):
+    """Bytes to send to the shell for a key event, or None if it is not one of ours."""
+    key = event.key()
+    text = event.text()
+    mods = event.modifiers()
+
+    # Detect "Ctrl" consistently across OSes
+    if sys.platform == "darwin":
+        ctrl_pressed = bool(mods & Qt.MetaModifier)
+    else:
+        ctrl_pressed = bool(mods & Qt.ControlModifier)
+
+    # Special handling for control shortcuts
+    if ctrl_pressed:
+        if key == Qt.Key_C:
+            return "\x03"  # ^C
+        elif key == Qt.Key_D:
+            return "\x04"  # ^D
+        elif key == Qt.Key_Z:
+            return "\x1A"  # ^Z
+        elif key == Qt.Key_L:
+            return "\x0C"  # ^L
+        elif key == Qt.Key_X:
+            return "\x18"  # ^X
+
+    # Enter, Tab, Backspace, etc. → send raw codes
+    if key == Qt.Key_Return or key == Qt.Key_Enter:
+        return "\r"
+    elif key == Qt.Key_Backspace:
+        return "\x7f"  # DEL
+    elif key == Qt.Key_Tab:
+        return "\t"    # HT (0x09)
+    elif text:
+        # Send all other printable characters
+        return text
+    # Handle arrows, Home, End, etc.
+    return ARROW_KEYS.get(key)
+
+def is_paste(event):
+    """Ctrl+Shift+V or Shift+Insert, as in other terminals (Ctrl+V is ^V), or Cmd+V on macOS."""
+    mods = event.modifiers() & ~Qt.KeypadModifier
+    if event.key() == Qt.Key_V and mods == Qt.ControlModifier | Qt.ShiftModifier:
+        return True
+    if event.key() == Qt.Key_Insert and mods == Qt.ShiftModifier:
+        return True
+    return sys.platform == "darwin" and event.matches(QKeySequence.Paste)
+
+def is_copy(event):
+    """Ctrl+Shift+C or Ctrl+Insert (Ctrl+C is ^C), or Cmd+C on macOS."""
+    mods = event.modifiers() & ~Qt.KeypadModifier
+    if event.key() == Qt.Key_C and mods == Qt.ControlModifier | Qt.ShiftModifier:
+        return True
+    if event.key() == Qt.Key_Insert and mods == Qt.ControlModifier:
+        return True
+    return sys.platform == "darwin" and event.matches(QKeySequence.Copy)
+
+ARROW_KEYS = {
+    Qt.Key_Left: "\x1b[D",
+    Qt.Key_Right: "\x1b[C",
+    Qt.Key_Up: "\x1b[A",
+    Qt.Key_Down: "\x1b[B",
+    Qt.Key_Home: "\x1b[H",
+    Qt.Key_End: "\x1b[F",
+}
+
 # QTextEdit subclass for interactive shell input
 class InteractiveShell(QTextEdit):
     def __init__(self, worker):
@@ -137,6 +523,49 @@ class InteractiveShell(QTextEdit):
         """)
         self.setLineWrapMode(QTextEdit.NoWrap)  # no automatic wrapping
         self.setFont(QFont("Courier New", 12))   # fixed-width font
+        # rows are edited in place, keeping undo history would grow forever
+        self.setUndoRedoEnabled(False)
+        self.shown_screen = None
+
+    def needs_rebuild(self, screen):
+        return screen is not self.shown_screen or self.document().blockCount() != screen.lines
+
+    def update_rows(self, screen, rows):
+        """
+        Replace the given rows ({row: html}) of the document, one text
+        block per screen row. rows must hold every row when needs_rebuild().
+        """
+        doc = self.document()
+        rebuild = self.needs_rebuild(screen)
+        if rebuild:
+            self.clear()
+        cursor = QTextCursor(doc)
+        cursor.beginEditBlock()
+        if rebuild:
+            for y in range(screen.lines):
+                if y:
+                    cursor.insertBlock()
+                cursor.insertHtml(rows[y])
+            self.shown_screen = screen
+        else:
+            for y, row_html in rows.items():
+                block = doc.findBlockByNumber(y)
+                cursor.setPosition(block.position())
+                cursor.setPosition(block.position() + block.length() - 1, QTextCursor.KeepAnchor)
+                cursor.insertHtml(row_html)
+        cursor.endEditBlock()
+
+    def refresh(self, screen):
+        """Re-render the rows pyte marked dirty (call with the worker lock held)."""
+        if self.needs_rebuild(screen):
+            dirty = range(screen.lines)
+        else:
+            dirty = sorted(screen.dirty)
+        rows = {y: render_pyte_row_as_html(screen, y) for y in dirty}
+        screen.dirty.clear()
+        if rows:
+            self.update_rows(screen, rows)
+        self.setCursor()
 
     def setCursor(self):
         cursor = self.textCursor()
@@ -152,61 +581,20 @@ class InteractiveShell(QTextEdit):
     
     def keyPressEvent(self, event):
         self.setCursor()
-        key = event.key()
-        text = event.text()
-        mods = event.modifiers()
-
-        # Detect "Ctrl" consistently across OSes
-        if sys.platform == "darwin":
-            ctrl_pressed = bool(mods & Qt.MetaModifier)
+        if is_paste(event):
+            self.worker.paste(QApplication.clipboard().text())
+            return
+        data = key_input(event)
+        if data is None:
+            super().keyPressEvent(event)
         else:
-            ctrl_pressed = bool(mods & Qt.ControlModifier)
-
-        # Special handling for control shortcuts
-        if ctrl_pressed:
-            if key == Qt.Key_C:
-                self.worker.send_input("\x03")  # ^C
-                return
-            elif key == Qt.Key_D:
-                self.worker.send_input("\x04")  # ^D
-                return
-            elif key == Qt.Key_Z:
-                self.worker.send_input("\x1A")  # ^Z
-                return
-            elif key == Qt.Key_L:
-                self.worker.send_input("\x0C")  # ^L
-                return
-            elif key == Qt.Key_X:
-                self.worker.send_input("\x18")  # ^X
-                return
-
-        # Enter, Tab, Backspace, etc. → send raw codes
-        if key == Qt.Key_Return or key == Qt.Key_Enter:
-            self.worker.send_input("\r")
-        elif key == Qt.Key_Backspace:
-            self.worker.send_input("\x7f")  # DEL
-        elif key == Qt.Key_Tab:
-            self.worker.send_input("\t")    # HT (0x09)
-        elif text:
-            # Send all other printable characters
-            self.worker.send_input(text)
-        else:
-            # Handle arrows, Home, End, etc.
-            if key == Qt.Key_Left:
-                self.worker.send_input("\x1b[D")
-            elif key == Qt.Key_Right:
-                self.worker.send_input("\x1b[C")
-            elif key == Qt.Key_Up:
-                self.worker.send_input("\x1b[A")
-            elif key == Qt.Key_Down:
-                self.worker.send_input("\x1b[B")
-            elif key == Qt.Key_Home:
-                self.worker.send_input("\x1b[H")
-            elif key == Qt.Key_End:
-                self.worker.send_input("\x1b[F")
-            else:
-                super().keyPressEvent(event)
+            self.worker.send_input(data)
         
+    def insertFromMimeData(self, source):
+        # context menu paste and drops go to the shell, not into the document
+        if source.hasText():
+            self.worker.paste(source.text())
+
     def mousePressEvent(self, event):
         self.setCursor()
         super().mousePressEvent(event)
@@ -217,9 +605,369 @@ class InteractiveShell(QTextEdit):
         super().focusInEvent(event)
 
 
+_NAMED_COLORS = {"brown": "#aa5500"}  # pyte's name for ANSI yellow
+_colors = {}
+
+def term_color(name, default):
+    """QColor for a pyte colour (a name, 'bright<name>' or 6 digit hex)."""
+    if name == "default" or not name:
+        return default
+    color = _colors.get(name)
+    if color is None:
+        base = name[6:] if name.startswith("bright") else name
+        color = QColor(_NAMED_COLORS.get(base, base))
+        if not color.isValid():
+            color = QColor("#" + base)
+        if not color.isValid():
+            return default
+        if base != name:
+            color = color.lighter(150)
+        _colors[name] = color
+    return color
+
+class GlyphAtlas:
+    """
+    Glyphs for one font, each rendered once per (char, fg, bold, underscore)
+    into a fixed-size cell of a shared atlas image, so painting a cell is a
+    single image blit instead of text layout.
+    """
+    PAGE_CELLS = 32  # cells per atlas row and column
+
+    def __init__(self, font, dpr=1.0):
+        self.font = QFont(font)
+        self.bold_font = QFont(font)
+        self.bold_font.setBold(True)
+        metrics = QFontMetricsF(self.font)
+        self.cell_w = math.ceil(metrics.horizontalAdvance("M"))
+        self.cell_h = math.ceil(metrics.height())
+        self.ascent = metrics.ascent()
+        self.dpr = dpr
+        self.pages = []
+        self.glyphs = {}  # key -> (page image, source rect in device pixels)
+
+    def _new_page(self):
+        # slots sit at multiples of cell_w/cell_h in logical pixels: at fractional
+        # DPRs rounding each cell first would leave the last row/column short
+        size = math.ceil(self.PAGE_CELLS * self.cell_w * self.dpr), math.ceil(self.PAGE_CELLS * self.cell_h * self.dpr)
+        page = QImage(*size, QImage.Format_ARGB32_Premultiplied)
+        page.setDevicePixelRatio(self.dpr)
+        page.fill(Qt.transparent)
+        self.pages.append(page)
+        return page
+
+    def glyph(self, char, fg, bold, underscore):
+        key = (char, fg.rgba(), bold, underscore)
+        entry = self.glyphs.get(key)
+        if entry is None:
+            slot = len(self.glyphs) % (self.PAGE_CELLS * self.PAGE_CELLS)
+            page = self.pages[-1] if slot else self._new_page()
+            x = slot % self.PAGE_CELLS * self.cell_w
+            y = slot // self.PAGE_CELLS * self.cell_h
+            painter = QPainter(page)
+            # keep overhanging glyphs from bleeding into neighbouring slots
+            painter.setClipRect(QRectF(x, y, self.cell_w, self.cell_h))
+            painter.setFont(self.bold_font if bold else self.font)
+            painter.setPen(fg)
+            painter.drawText(QPointF(x, y + self.ascent), char)
+            if underscore:
+                painter.drawLine(QPointF(x, y + self.cell_h - 1), QPointF(x + self.cell_w, y + self.cell_h - 1))
+            painter.end()
+            source = QRectF(x * self.dpr, y * self.dpr, self.cell_w * self.dpr, self.cell_h * self.dpr)
+            entry = self.glyphs[key] = (page, source)
+        return entry
+
+class TerminalView(QWidget):
+    """
+    Paints the pyte screen directly: one background fill per run of cells
+    with the same background and one atlas blit per visible glyph. Only
+    rows pyte marked dirty are repainted.
+
+    The mouse wheel and Shift+PageUp/PageDown scroll back through the
+    screen's history; view_top is then the first line shown, counting
+    history lines first and screen rows after them, or None when live.
+
+    Dragging selects text (by those line numbers, so it stays on the same
+    text as the screen scrolls); Ctrl+Shift+C or the context menu copies it.
+    """
+
+    def __init__(self, worker):
+        super().__init__()
+        self.worker = worker
+        self.screen = worker.fail_screen
+        self.fg = QColor("white")
+        self.bg = QColor("black")
+        self.font = QFont("Courier New", 12)
+        self.font.setStyleHint(QFont.TypeWriter)
+        self.atlas = None
+        self.cells = {}
+        self.cells_atlas = None
+        self.cursor_row = 0
+        self.view_top = None
+        self.highlight = None  # line number of the current search match
+        self.sel_start = self.sel_end = None  # (line, column boundary) of the selection's ends
+        self.setFocusPolicy(Qt.StrongFocus)
+        self.setAttribute(Qt.WA_OpaquePaintEvent)
+        self.setMinimumSize(self.cell_size()[0] * 20, self.cell_size()[1] * 5)
+
+    def get_atlas(self):
+        dpr = self.devicePixelRatioF()
+        if self.atlas is None or self.atlas.dpr != dpr:
+            self.atlas = GlyphAtlas(self.font, dpr)
+        return self.atlas
+
+    def cell_size(self):
+        atlas = self.get_atlas()
+        return atlas.cell_w, atlas.cell_h
+
+    def sizeHint(self):
+        cell_w, cell_h = self.cell_size()
+        return QSize(cell_w * self.worker.cols, cell_h * self.worker.rows)
+
+    def refresh(self, screen):
+        """Schedule repaints of the rows pyte marked dirty (call with the worker lock held)."""
+        cell_h = self.cell_size()[1]
+        if screen is not self.screen or self.view_top is not None:
+            self.screen = screen
+            self.update()
+        else:
+            rows = set(screen.dirty)
+            rows.add(self.cursor_row)
+            rows.add(screen.cursor.y)
+            for y in rows:
+                self.update(0, y * cell_h, self.width(), cell_h)
+        self.cursor_row = screen.cursor.y
+        screen.dirty.clear()
+
+    def paintEvent(self, event):
+        painter = QPainter(self)
+        rect = event.rect()
+        painter.fillRect(rect, self.bg)
+        atlas = self.get_atlas()
+        cell_h = atlas.cell_h
+        with self.worker.lock:
+            screen = self.screen
+            history = getattr(screen, "history", None)
+            live = self.view_top is None or history is None
+            top = self.top_line(history)
+            first = max(0, rect.top() // cell_h)
+            last = min(screen.lines - 1, rect.bottom() // cell_h)
+            for y in range(first, last + 1):
+                n = top + y
+                if live:
+                    row = screen.buffer[y]
+                elif n < history.total:
+                    row = history.row(n)
+                elif n - history.total < screen.lines:
+                    row = screen.buffer[n - history.total]
+                else:
+                    continue
+                self.paint_row(painter, atlas, row, screen.columns, y)
+                if n == self.highlight:
+                    painter.fillRect(0, y * cell_h, self.width(), cell_h, QColor(255, 255, 0, 70))
+                span = self.selected_span(n, screen.columns)
+                if span is not None:
+                    painter.fillRect(span[0] * atlas.cell_w, y * cell_h, (span[1] - span[0]) * atlas.cell_w,
+                                     cell_h, QColor(80, 140, 255, 110))
+            if live and screen is self.worker.screen and first <= screen.cursor.y <= last and not screen.cursor.hidden:
+                painter.setCompositionMode(QPainter.RasterOp_SourceXorDestination)
+                painter.fillRect(screen.cursor.x * atlas.cell_w, screen.cursor.y * cell_h,
+                                 atlas.cell_w, cell_h, QColor("white"))
+
+    def top_line(self, history):
+        """Line number of the top row shown (call with the worker lock held)."""
+        if history is None:
+            return 0
+        if self.view_top is None:
+            return history.total
+        return max(self.view_top, history.first)
+
+    def cell_at(self, pos):
+        """(line, column boundary) nearest to a point in the widget."""
+        cell_w, cell_h = self.cell_size()
+        screen = self.screen
+        y = min(max(int(pos.y() // cell_h), 0), screen.lines - 1)
+        x = min(max(round(pos.x() / cell_w), 0), screen.columns)
+        with self.worker.lock:
+            return self.top_line(getattr(screen, "history", None)) + y, x
+
+    def selection(self):
+        """The selection's (start, end) in reading order, or None if nothing is selected."""
+        if self.sel_start is None or self.sel_start == self.sel_end:
+            return None
+        return min(self.sel_start, self.sel_end), max(self.sel_start, self.sel_end)
+
+    def selected_span(self, n, columns):
+        """Columns [a, b) of line n that are selected, or None."""
+        sel = self.selection()
+        if sel is None or not sel[0][0] <= n <= sel[1][0]:
+            return None
+        a = sel[0][1] if n == sel[0][0] else 0
+        b = sel[1][1] if n == sel[1][0] else columns
+        return (a, b) if a < b else None
+
+    def selected_text(self):
+        sel = self.selection()
+        if sel is None:
+            return ""
+        lines = []
+        with self.worker.lock:
+            screen = self.screen
+            history = getattr(screen, "history", None)
+            total = history.total if history is not None else 0
+            for n in range(sel[0][0], sel[1][0] + 1):
+                if history is not None and history.first <= n < total:
+                    row = history.row(n)
+                elif 0 <= n - total < screen.lines:
+                    row = screen.buffer[n - total]
+                else:
+                    continue  # evicted from history since it was selected
+                a, b = self.selected_span(n, screen.columns) or (0, 0)
+                chars = (row.get(x) for x in range(a, b))
+                lines.append("".join(c.data for c in chars if c is not None).rstrip())
+        return "\n".join(lines)
+
+    def copy(self):
+        text = self.selected_text()
+        if text:
+            QApplication.clipboard().setText(text)
+
+    def mousePressEvent(self, event):
+        if event.button() != Qt.LeftButton:
+            super().mousePressEvent(event)
+            return
+        self.sel_start = self.sel_end = self.cell_at(event.position())
+        self.update()
+
+    def mouseMoveEvent(self, event):
+        if not event.buttons() & Qt.LeftButton or self.sel_start is None:
+            return
+        # dragging past the top or bottom edge scrolls
+        if event.position().y() < 0:
+            self.scroll_by(-1)
+        elif event.position().y() >= self.height():
+            self.scroll_by(1)
+        self.sel_end = self.cell_at(event.position())
+        self.update()
+
+    def mouseReleaseEvent(self, event):
+        clipboard = QApplication.clipboard()
+        if event.button() == Qt.LeftButton and self.selection() and clipboard.supportsSelection():
+            clipboard.setText(self.selected_text(), QClipboard.Selection)  # X11 middle-click paste
+
+    def contextMenuEvent(self, event):
+        menu = QMenu(self)
+        menu.addAction("Copy", self.copy).setEnabled(self.selection() is not None)
+        menu.addAction("Paste", lambda: self.worker.paste(QApplication.clipboard().text()))
+        menu.exec(event.globalPos())
+
+    def scroll_by(self, lines):
+        history = getattr(self.screen, "history", None)
+        if history is None:
+            return
+        with self.worker.lock:
+            first, total = history.first, history.total
+        top = (total if self.view_top is None else self.view_top) + lines
+        self.view_top = None if top >= total else max(top, first)
+        self.update()
+
+    def go_live(self):
+        if self.view_top is not None or self.highlight is not None:
+            self.view_top = self.highlight = None
+            self.update()
+
+    def search(self, query):
+        """Line numbers of history lines and screen rows containing query, oldest first."""
+        history = getattr(self.screen, "history", None)
+        if history is None or not query:
+            return []
+        q = query.lower()
+        with self.worker.lock:
+            matches = history.search(query)
+            total = history.total
+            matches += [total + y for y, line in enumerate(self.screen.display) if q in line.lower()]
+        return matches
+
+    def show_line(self, n):
+        """Scroll so line n is in the middle of the view and highlight it."""
+        history = self.screen.history
+        with self.worker.lock:
+            first, total = history.first, history.total
+        top = n - self.screen.lines // 2
+        self.view_top = None if top >= total else max(top, first)
+        self.highlight = n
+        self.update()
+
+    def wheelEvent(self, event):
+        self.scroll_by(-round(event.angleDelta().y() / 40))  # 3 lines per notch
+
+    def cell_style(self, atlas, char):
+        """(background or None for the default, atlas glyph or None) for a pyte Char."""
+        if char is None:
+            return None, None
+        fg = term_color(char.fg, self.fg)
+        bg = term_color(char.bg, None)
+        if char.reverse:
+            fg, bg = bg or self.bg, fg
+        glyph = None
+        if char.data.strip():
+            glyph = atlas.glyph(char.data, fg, char.bold, char.underscore)
+        return bg, glyph
+
+    def paint_row(self, painter, atlas, row, columns, y):
+        # pyte Chars are namedtuples, so styles are cached per distinct Char
+        if self.cells_atlas is not atlas:
+            self.cells, self.cells_atlas = {}, atlas
+        cells = self.cells
+        cell_w, cell_h = atlas.cell_w, atlas.cell_h
+        top = y * cell_h
+        run_start, run_bg = 0, None
+        glyphs = []
+        for x in range(columns):
+            char = row.get(x)
+            style = cells.get(char)
+            if style is None:
+                style = cells[char] = self.cell_style(atlas, char)
+            bg, glyph = style
+            # one fill per run of cells sharing a background
+            if bg is not run_bg:
+                if run_bg is not None:
+                    painter.fillRect(run_start * cell_w, top, (x - run_start) * cell_w, cell_h, run_bg)
+                run_start, run_bg = x, bg
+            if glyph is not None:
+                glyphs.append((x, glyph))
+        if run_bg is not None:
+            painter.fillRect(run_start * cell_w, top, (columns - run_start) * cell_w, cell_h, run_bg)
+        for x, (page, source) in glyphs:
+            painter.drawImage(QPointF(x * cell_w, top), page, source)
+
+    def keyPressEvent(self, event):
+        if event.modifiers() & Qt.ShiftModifier and event.key() in (Qt.Key_PageUp, Qt.Key_PageDown):
+            page = self.screen.lines - 1
+            self.scroll_by(-page if event.key() == Qt.Key_PageUp else page)
+            return
+        if is_paste(event):
+            self.go_live()
+            self.worker.paste(QApplication.clipboard().text())
+            return
+        if is_copy(event):
+            self.copy()
+            return
+        data = key_input(event)
+        if data is None:
+            super().keyPressEvent(event)
+        else:
+            self.go_live()
+            self.worker.send_input(data)
+
+    def focusNextPrevChild(self, next):
+        return False  # keep Tab for the shell
+
+# ROVER_SHELL_RECORD=dir records every SSH session's raw output for shell_replay.py
+record_dir = os.environ.get("ROVER_SHELL_RECORD")
+
 class ShellTab(QWidget):
 
-    def __init__(self):
+    def __init__(self, native=True):
         super().__init__()
         layout = QVBoxLayout(self)
 
@@ -236,6 +984,7 @@ class ShellTab(QWidget):
         self.log_output.setReadOnly(True)
         self.log_output.setStyleSheet("background-color: black; color: white; font-family: monospace;")
         self.log_output.setPlainText("System Log:\n> Ready...\n")
+        self.log_output.document().setMaximumBlockCount(5000)  # command output can be long
         left_layout.addWidget(self.log_output, stretch=4)
 
         # Command input
@@ -245,6 +994,10 @@ class ShellTab(QWidget):
         self.command_input.returnPressed.connect(self.handle_command)
         left_layout.addWidget(self.command_input, stretch=0)
 
+        # File transfers
+        self.transfer_panel = self.create_transfer_panel()
+        left_layout.addWidget(self.transfer_panel, stretch=2)
+
         splitter.addWidget(left_panel)
 
         # -------------------
@@ -253,11 +1006,38 @@ class ShellTab(QWidget):
         #self.conv = Ansi2HTMLConverter(inline=True)
         with open(".ssh_login","r") as f:
             login = f.readlines()
-        self.worker = SSHWorker(login[0], login[1], password=login[2])
-        self.shell = InteractiveShell(self.worker)
-        splitter.addWidget(self.shell)
+        self.worker = SSHWorker(login[0], login[1], password=login[2], record_dir=record_dir)
+        # one-shot commands from the command box share one paramiko connection
+        self.commands = SSHPool(login[0].strip(), login[1].strip(), password=login[2].strip())
+        self.commands.output.connect(self.on_command_output)
+        self.commands.finished.connect(self.on_command_finished)
+        # native=False keeps the older HTML/QTextEdit renderer
+        self.shell = TerminalView(self.worker) if native else InteractiveShell(self.worker)
+        if native:
+            right_panel = QWidget()
+            right_layout = QVBoxLayout(right_panel)
+            right_layout.setContentsMargins(0, 0, 0, 0)
+            search_layout = QHBoxLayout()
+            self.search_input = QLineEdit()
+            self.search_input.setPlaceholderText("Search scrollback (Enter: older, Shift+Enter: newer, Esc: back)")
+            self.search_input.textChanged.connect(self.on_search_changed)
+            self.search_input.returnPressed.connect(self.on_search_next)
+            QShortcut(QKeySequence(Qt.Key_Escape), self.search_input, self.on_search_cancel,
+                      context=Qt.WidgetShortcut)
+            self.search_status = QLabel("")
+            search_layout.addWidget(self.search_input)
+            search_layout.addWidget(self.search_status)
+            right_layout.addLayout(search_layout)
+            right_layout.addWidget(self.shell, stretch=1)
+            self.search_matches = []
+            self.search_pos = 0
+            splitter.addWidget(right_panel)
+        else:
+            splitter.addWidget(self.shell)
         
         self.worker.output_ready.connect(self.display_output)
+        self.worker.state_changed.connect(self.on_ssh_state)
+        self.worker.input_sent.connect(self.on_input_sent)
         self.worker.start()
 
         splitter.setSizes([400, 600])
@@ -265,20 +1045,142 @@ class ShellTab(QWidget):
 
         
     def display_output(self, screen_text):
-        if self.worker.connected:
-            html = render_pyte_screen_as_html(self.worker.screen)
+        # only rows pyte marked dirty since the last update are redrawn
+        screen = self.worker.screen if self.worker.connected else self.worker.fail_screen
+        with self.worker.lock:
+            self.shell.refresh(screen)
+
+    def on_search_changed(self, text):
+        # newest match first, as that is usually what the operator is after
+        self.search_matches = self.shell.search(text)
+        self.search_pos = len(self.search_matches)
+        if self.search_matches:
+            self.on_search_next()
         else:
-            html = render_pyte_screen_as_html(self.worker.fail_screen)
-        self.shell.setHtml(html)
-        self.shell.setCursor()
+            self.search_status.setText("no match" if text else "")
+            self.shell.go_live()
 
+    def on_search_next(self):
+        if not self.search_matches:
+            return
+        older = not QApplication.keyboardModifiers() & Qt.ShiftModifier
+        step = -1 if older else 1
+        self.search_pos = (self.search_pos + step) % len(self.search_matches)
+        self.shell.show_line(self.search_matches[self.search_pos])
+        self.search_status.setText(f"{self.search_pos + 1}/{len(self.search_matches)}")
+
+    def on_search_cancel(self):
+        self.search_input.clear()
+        self.shell.go_live()
+        self.shell.setFocus()
+
+    def create_transfer_panel(self):
+        panel = QGroupBox("File Transfers (SFTP)")
+        layout = QVBoxLayout(panel)
+
+        row = QHBoxLayout()
+        self.remote_path = QLineEdit()
+        self.remote_path.setPlaceholderText("Remote file, e.g. /home/rover/bags/run1.bag")
+        self.remote_path.returnPressed.connect(self.on_download)
+        download_btn = QPushButton("Download")
+        download_btn.clicked.connect(self.on_download)
+        row.addWidget(self.remote_path)
+        row.addWidget(download_btn)
+        layout.addLayout(row)
+
+        row = QHBoxLayout()
+        self.download_dir = QLineEdit(os.path.expanduser("~/rover_downloads"))
+        cancel_btn = QPushButton("Cancel")
+        cancel_btn.clicked.connect(self.on_cancel_transfer)
+        row.addWidget(QLabel("Save to:"))
+        row.addWidget(self.download_dir)
+        row.addWidget(cancel_btn)
+        layout.addLayout(row)
+
+        # goes through the interactive shell, so it lands wherever that shell is
+        upload_btn = QPushButton("Upload File Into Shell...")
+        upload_btn.clicked.connect(self.on_upload)
+        layout.addWidget(upload_btn)
+
+        self.transfer_table = QTableWidget(0, 4)
+        self.transfer_table.setHorizontalHeaderLabels(["File", "Progress", "Rate", "State"])
+        self.transfer_table.horizontalHeader().setSectionResizeMode(3, QHeaderView.Stretch)
+        self.transfer_table.setSelectionBehavior(QTableWidget.SelectRows)
+        self.transfer_table.setEditTriggers(QTableWidget.NoEditTriggers)
+        layout.addWidget(self.transfer_table)
+
+        self.transfers = []  # [Download, progress bar, last received, last time, rate]
+        self.transfer_timer = QTimer(self)
+        self.transfer_timer.timeout.connect(self.update_transfers)
+        self.transfer_timer.start(500)
+        return panel
+
+    def on_download(self):
+        remote = self.remote_path.text().strip()
+        if not remote:
+            return
+        local_dir = self.download_dir.text().strip()
+        os.makedirs(local_dir, exist_ok=True)
+        download = Download(self.commands, remote, local_dir)
+        row = self.transfer_table.rowCount()
+        self.transfer_table.insertRow(row)
+        self.transfer_table.setItem(row, 0, QTableWidgetItem(os.path.basename(download.local)))
+        bar = QProgressBar()
+        self.transfer_table.setCellWidget(row, 1, bar)
+        self.transfer_table.setItem(row, 2, QTableWidgetItem(""))
+        self.transfer_table.setItem(row, 3, QTableWidgetItem(download.state))
+        self.transfers.append([download, bar, 0, time.monotonic(), 0.0])
+        download.start()
+        self.remote_path.clear()
+
+    def on_upload(self):
+        path, _ = QFileDialog.getOpenFileName(self, "Upload into the shell's working directory")
+        if not path:
+            return
+        if not self.worker.connected:
+            self.log_output.append("> upload: shell not connected")
+            return
+        self.log_output.append(f"> uploading {os.path.basename(path)} ({os.path.getsize(path) / 1e3:.0f} kB)"
+                               " into the shell, Ctrl+C in the shell cancels")
+        self.worker.upload(path)
+
+    def on_input_sent(self, label, complete):
+        self.log_output.append(f"> {label}: {'sent' if complete else 'cancelled'}")
+
+    def on_cancel_transfer(self):
+        for index in self.transfer_table.selectionModel().selectedRows():
+            self.transfers[index.row()][0].cancel()
+
+    def update_transfers(self):
+        now = time.monotonic()
+        for row, entry in enumerate(self.transfers):
+            download, bar, last_received, last_time, rate = entry
+            if download.finished and bar.value() == bar.maximum() and entry[4] == 0:
+                continue  # nothing left to update
+            if download.size:
+                bar.setMaximum(1000)
+                bar.setValue(int(1000 * download.done_bytes / download.size))
+            # smoothed over a few ticks so a bursty link reads steadily
+            instant = (download.received - last_received) / max(now - last_time, 1e-3)
+            rate = 0.0 if download.finished else 0.6 * rate + 0.4 * instant
+            entry[2:] = [download.received, now, rate]
+            self.transfer_table.item(row, 2).setText(f"{rate / 1e3:.0f} kB/s" if rate else "")
+            self.transfer_table.item(row, 3).setText(download.state)
+
+    def on_ssh_state(self, state):
+        self.log_output.append(f"> ssh: {state}")
 
-        
     def handle_command(self):
         """Triggered when user presses Enter in the left command box"""
         cmd = self.command_input.text().strip()
         if cmd:
-            self.log_output.append(f"> {cmd}")
-            # TODO: send cmd to backend and append result
-            self.log_output.append(f"(mock response to '{cmd}')\n")
-        self.command_input.clear()
\ No newline at end of file
+            job = self.commands.run(cmd)
+            self.log_output.append(f"> [{job}] {cmd}")
+        self.command_input.clear()
+
+    def on_command_output(self, job, text):
+        # commands run concurrently, so every line is tagged with its job
+        self.log_output.append("\n".join(f"[{job}] {line}" for line in text.split("\n")))
+
+    def on_command_finished(self, job, status):
+        self.log_output.append(f"[{job}] exit {status}")
\ No newline at end of file
@@ -0,0 +1,244 @@
+#!/usr/bin/env python3
+"""
+Fixed-rate teleop command streaming over UDP
+
+TeleopSender samples controller state at a fixed rate, maps it to drive
+and arm commands and sends each as one small datagram:
+    <"TP"> <version u8> <kind u8> <seq u32> <sent time_ns u64> <int16 values>
+Commands are latest-wins: only the current state is ever sampled, a send
+that would block is dropped, and receivers discard anything older than the
+newest sequence number they have seen. Each kind is numbered on its own,
+so a drive command is never judged stale by an arm command.
+
+TeleopReceiver is a local stand-in for the rover side that reports command
+rate, loss and one-way latency (latency assumes the clocks are synced,
+e.g. both ends on the same machine or running chrony).
+
+Usage:
+    python3 teleop.py receive [port]
+"""
+
+import socket
+import struct
+import sys
+import threading
+import time
+
+import latency
+
+ROVER_HOST = "192.168.0.10"
+TELEOP_PORT = 5005
+
+HEADER = struct.Struct("<2sBBIQ")
+MAGIC = b"TP"
+VERSION = 1
+
+KIND_DRIVE = 1  # forward, turn
+KIND_ARM = 2    # azimuth, shoulder, elbow, wrist1, wrist2, wrist3, gripper
+KIND_NAMES = {KIND_DRIVE: "drive", KIND_ARM: "arm"}
+_VALUES = {KIND_DRIVE: struct.Struct("<2h"), KIND_ARM: struct.Struct("<7h")}
+_ZEROS = dict((kind, (0.0,) * (fmt.size // 2)) for kind, fmt in _VALUES.items())
+
+DEADZONE = 0.08
+
+def _axis(raw, deadzone=DEADZONE):
+    """int16 stick reading -> [-1, 1] with a deadzone."""
+    v = max(-1.0, raw / 32767)
+    if abs(v) < deadzone:
+        return 0.0
+    return v
+
+def _trigger(raw):
+    return raw / 1023
+
+def drive_command(state):
+    """Left stick forward/back, right stick turn."""
+    return (_axis(state["stick_left_y"]), _axis(state["stick_right_x"]))
+
+def arm_command(state):
+    """Joint velocities in the arm panel's joint order."""
+    return (
+        _axis(state["stick_left_x"]),
+        _axis(state["stick_left_y"]),
+        _axis(state["stick_right_y"]),
+        _axis(state["stick_right_x"]),
+        float(state["dpad_up"] - state["dpad_down"]),
+        float(state["dpad_right"] - state["dpad_left"]),
+        _trigger(state["trigger_right"]) - _trigger(state["trigger_left"]),
+    )
+
+def pack_command(kind, seq, values, sent_ns=None):
+    if sent_ns is None:
+        sent_ns = time.time_ns()
+    scaled = [int(max(-1.0, min(1.0, v)) * 32767) for v in values]
+    return HEADER.pack(MAGIC, VERSION, kind, seq & 0xFFFFFFFF, sent_ns) + _VALUES[kind].pack(*scaled)
+
+def unpack_command(datagram):
+    """Return (kind, seq, sent_ns, values in [-1, 1]) or None if malformed."""
+    if len(datagram) < HEADER.size:
+        return None
+    magic, version, kind, seq, sent_ns = HEADER.unpack_from(datagram)
+    if magic != MAGIC or version != VERSION or kind not in _VALUES:
+        return None
+    if len(datagram) != HEADER.size + _VALUES[kind].size:
+        return None
+    values = tuple(v / 32767 for v in _VALUES[kind].unpack_from(datagram, HEADER.size))
+    return kind, seq, sent_ns, values
+
+class TeleopSender:
+    """
+    Streams commands for every bound controller at rate_hz.
+
+    bind(kind, get_controller, mapper): get_controller returns the current
+    PowerAController (or None) and mapper turns its snapshot() into values.
+    A missing or disconnected controller streams zeros.
+    """
+
+    def __init__(self, host=ROVER_HOST, port=TELEOP_PORT, rate_hz=50):
+        self.addr = (host, port)
+        self.rate_hz = rate_hz
+        self.bindings = {}
+        self.last_read = {}  # kind -> read time of the last state sent
+        self.seq = {}  # kind -> last sequence number sent
+        self.running = False
+        self.thread = None
+        self.sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        # a tiny send buffer keeps the kernel from queueing stale commands
+        self.sock.setsockopt(socket.SOL_SOCKET, socket.SO_SNDBUF, 4096)
+        self.sock.setblocking(False)
+        self.dropped = 0
+
+    def bind(self, kind, get_controller, mapper):
+        self.bindings[kind] = (get_controller, mapper)
+
+    def start(self):
+        if self.running:
+            return
+        self.running = True
+        self.thread = threading.Thread(target=self.run, daemon=True)
+        self.thread.start()
+
+    def stop(self):
+        if not self.running:
+            return
+        self.running = False
+        self.thread.join()
+        # make sure the rover sees a stop even if the last tick was lost
+        for _ in range(3):
+            self.send_zeros()
+
+    def send(self, kind, values):
+        seq = self.seq[kind] = self.seq.get(kind, 0) + 1
+        try:
+            self.sock.sendto(pack_command(kind, seq, values), self.addr)
+        except (BlockingIOError, OSError):
+            self.dropped += 1
+
+    def send_zeros(self):
+        for kind in self.bindings:
+            self.send(kind, _ZEROS[kind])
+
+    def tick(self):
+        for kind, (get_controller, mapper) in self.bindings.items():
+            cont = get_controller()
+            if cont is None or not cont.connected:
+                self.send(kind, _ZEROS[kind])
+            else:
+                state = cont.snapshot()
+                self.send(kind, mapper(state))
+                # only the first datagram carrying a report measures latency
+                if state["t_read"] and state["t_read"] != self.last_read.get(kind):
+                    latency.since("read->command", state["t_read"])
+                    self.last_read[kind] = state["t_read"]
+
+    def run(self):
+        next_t = time.monotonic()
+        while self.running:
+            self.tick()
+            period = 1 / self.rate_hz
+            next_t += period
+            delay = next_t - time.monotonic()
+            if delay > 0:
+                time.sleep(delay)
+            else:
+                # fell behind: skip the missed ticks instead of bursting them
+                next_t = time.monotonic()
+
+class TeleopReceiver:
+    """Rover-side stand-in: keeps the newest command per kind and link stats."""
+
+    def __init__(self, port=TELEOP_PORT, host="0.0.0.0"):
+        self.sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self.sock.bind((host, port))
+        self.sock.settimeout(0.5)
+        self.latest = {}
+        self.histogram = latency.stage("command->rover")
+        self.reset_stats()
+
+    def reset_stats(self):
+        self.received = 0
+        self.stale = 0
+        self.lost = 0
+        self.latency_sum = 0
+        self.latency_max = 0
+        self.last_seq = {}  # kind -> newest sequence number accepted
+        self.window_start = time.monotonic()
+
+    def receive_one(self):
+        try:
+            datagram = self.sock.recv(512)
+        except socket.timeout:
+            return None
+        now_ns = time.time_ns()
+        command = unpack_command(datagram)
+        if command is None:
+            return None
+        kind, seq, sent_ns, values = command
+        # each kind has its own sequence numbers
+        last_seq = self.last_seq.get(kind)
+        if last_seq is not None:
+            gap = (seq - last_seq) & 0xFFFFFFFF
+            if gap == 0 or gap > 0x7FFFFFFF:
+                self.stale += 1
+                return None
+            self.lost += gap - 1
+        self.last_seq[kind] = seq
+        self.received += 1
+        one_way = now_ns - sent_ns
+        self.latency_sum += one_way
+        self.latency_max = max(self.latency_max, one_way)
+        self.histogram.record(one_way / 1e9)
+        self.latest[kind] = values
+        return command
+
+    def report(self):
+        elapsed = time.monotonic() - self.window_start
+        expected = self.received + self.lost
+        loss = 100 * self.lost / expected if expected else 0.0
+        avg_ms = self.latency_sum / self.received / 1e6 if self.received else 0.0
+        line = (f"{self.received / elapsed:6.1f} cmd/s  loss {loss:5.1f}%  "
+                f"stale {self.stale}  latency avg {avg_ms:6.2f} ms  max {self.latency_max / 1e6:6.2f} ms")
+        for kind, values in sorted(self.latest.items()):
+            line += f"  {KIND_NAMES[kind]}=" + ",".join(f"{v:+.2f}" for v in values)
+        last_seq = self.last_seq
+        self.reset_stats()
+        self.last_seq = last_seq
+        return line
+
+    def run(self, interval=1.0):
+        while True:
+            self.receive_one()
+            if time.monotonic() - self.window_start >= interval:
+                print(self.report())
+
+if __name__ == "__main__":
+    if len(sys.argv) < 2 or sys.argv[1] != "receive":
+        print(__doc__)
+        sys.exit(1)
+    port = int(sys.argv[2]) if len(sys.argv) > 2 else TELEOP_PORT
+    print(f"Listening for teleop commands on udp/{port}")
+    try:
+        TeleopReceiver(port).run()
+    except KeyboardInterrupt:
+        print()
+        print(latency.summary_text())
@@ -0,0 +1,41 @@
+import unittest
+
+import controller
+from benchmarks.bench_decode import CannedDevice, make_report
+
+class _NoManager:
+    def add(self, cont):
+        pass
+
+class DecodeReportTest(unittest.TestCase):
+    def setUp(self):
+        self.cont = controller.PowerAController(0, dev=CannedDevice(), manager=_NoManager())
+        self.events = []
+        self.cont.events.changed.connect(lambda changes, t_read: self.events.append(changes))
+
+    def feed(self, report):
+        memoryview(self.cont._buf)[:len(report)] = report
+        self.cont.decode_report(len(report))
+
+    def test_sequence_number_alone_is_not_a_change(self):
+        self.feed(make_report(seq=1))
+        self.events.clear()
+        for seq in range(2, 300):
+            self.feed(make_report(seq=seq))
+        self.assertEqual(self.events, [])
+
+    def test_changes_leave_out_the_header(self):
+        self.feed(make_report(seq=1))
+        self.feed(make_report(stick_x=1234, seq=2))
+        self.assertEqual(self.events[-1], {"stick_left_x": 1234})
+
+    def test_button_bits(self):
+        report = controller.ButtonData.from_buffer(make_report(seq=5))
+        report.y = 1
+        report.dpad_up = 1
+        self.feed(make_report(seq=4))
+        self.feed(bytes(report))
+        self.assertEqual(self.events[-1], {"y": 1, "dpad_up": 1})
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,54 @@
+import socket
+import unittest
+
+import teleop
+from teleop import KIND_ARM, KIND_DRIVE, pack_command
+
+class ReorderedKindsTest(unittest.TestCase):
+    def setUp(self):
+        self.receiver = teleop.TeleopReceiver(port=0, host="127.0.0.1")
+        self.addr = self.receiver.sock.getsockname()
+        self.sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+
+    def tearDown(self):
+        self.sock.close()
+        self.receiver.sock.close()
+
+    def deliver(self, *commands):
+        for kind, seq, values in commands:
+            self.sock.sendto(pack_command(kind, seq, values), self.addr)
+        return [self.receiver.receive_one() for _ in commands]
+
+    def test_arm_does_not_make_newer_drive_stale(self):
+        # drive 2 was sent before arm 2 but arrives after it
+        arm = (0.5,) * 7
+        self.deliver((KIND_DRIVE, 1, (0.1, 0.1)), (KIND_ARM, 1, arm))
+        accepted = self.deliver((KIND_ARM, 2, arm), (KIND_DRIVE, 2, (0.9, -0.9)))
+        self.assertTrue(all(accepted))
+        self.assertEqual(self.receiver.stale, 0)
+        self.assertAlmostEqual(self.receiver.latest[KIND_DRIVE][0], 0.9, places=3)
+        self.assertAlmostEqual(self.receiver.latest[KIND_DRIVE][1], -0.9, places=3)
+
+    def test_reordered_within_a_kind_is_stale(self):
+        accepted = self.deliver((KIND_DRIVE, 1, (0.1, 0.0)), (KIND_ARM, 1, (0.0,) * 7),
+                                (KIND_DRIVE, 3, (0.3, 0.0)), (KIND_ARM, 2, (0.2,) * 7),
+                                (KIND_DRIVE, 2, (0.2, 0.0)), (KIND_ARM, 3, (0.3,) * 7))
+        self.assertEqual([c is not None for c in accepted], [True, True, True, True, False, True])
+        self.assertEqual(self.receiver.stale, 1)
+        self.assertEqual(self.receiver.lost, 1)  # drive 2, counted as lost when 3 overtook it
+        self.assertAlmostEqual(self.receiver.latest[KIND_DRIVE][0], 0.3, places=3)
+        self.assertAlmostEqual(self.receiver.latest[KIND_ARM][0], 0.3, places=3)
+
+    def test_sender_numbers_each_kind(self):
+        sender = teleop.TeleopSender(*self.addr)
+        try:
+            for kind in (KIND_DRIVE, KIND_ARM, KIND_ARM, KIND_DRIVE):
+                sender.send(kind, teleop._ZEROS[kind])
+            received = [self.receiver.receive_one()[:2] for _ in range(4)]
+        finally:
+            sender.sock.close()
+        self.assertEqual(received, [(KIND_DRIVE, 1), (KIND_ARM, 1), (KIND_ARM, 2), (KIND_DRIVE, 2)])
+        self.assertEqual(self.receiver.lost, 0)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,161 @@
+"""
+Video link statistics for the camera view
+
+VideoStats collects what each stage of a camera stream does and turns it
+into one row per second, so stutter can be traced to its stage:
+    link     packets pushed/lost/late and the RFC 3550 interarrival jitter,
+             from the camera's rtpjitterbuffer
+    decoder  time from a buffer entering avdec_h264 to its frame leaving
+    GUI      frames reaching the appsink vs frames painted, and how unevenly
+             they arrive (standard deviation of the frame interval)
+Latency comes from RTP timestamps: the jitterbuffer maps each frame's RTP
+time onto the local clock from the first packets, so "now - PTS" is the
+delay added since then by the link, the decoder and the GUI (the sender's
+encode time and the fixed part of the network delay are not included).
+latency_ms is measured at the appsink, paint_latency_ms when painted.
+
+The last `history` rows are kept for export with write_csv(), and with
+ROVER_VIDEO_STATS=file.csv every row is also appended to that file as it
+is made.
+"""
+
+import csv
+import math
+import os
+import time
+from collections import deque
+from threading import Lock
+
+FIELDS = ("time", "camera", "packets", "lost", "late", "net_jitter_ms",
+          "fps_in", "fps_painted", "gui_dropped", "frame_jitter_ms",
+          "decode_ms", "decode_max_ms", "latency_ms", "paint_latency_ms")
+
+class _Mean:
+    """Running count, mean and max of one window."""
+    __slots__ = ("count", "total", "peak")
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.peak = 0.0
+
+    def add(self, value):
+        self.count += 1
+        self.total += value
+        self.peak = max(self.peak, value)
+
+    @property
+    def mean(self):
+        return self.total / self.count if self.count else None
+
+class VideoStats:
+    def __init__(self, history=3600, path=None):
+        self.lock = Lock()
+        self.rows = deque(maxlen=history)
+        self.path = path
+        self.counters = {}  # camera -> its jitterbuffer's last cumulative counters
+        self.frames = (0, 0)  # frames in / painted at the last row
+        self.window_start = time.monotonic()
+        self._new_window()
+
+    def _new_window(self):
+        self.last_arrival = None
+        self.intervals = []
+        self.decode = _Mean()
+        self.latency = _Mean()
+        self.paint_latency = _Mean()
+
+    # the next three are called from streaming threads
+
+    def frame_arrived(self, latency_s):
+        now = time.monotonic()
+        with self.lock:
+            if self.last_arrival is not None:
+                self.intervals.append(now - self.last_arrival)
+            self.last_arrival = now
+            if latency_s is not None:
+                self.latency.add(latency_s)
+
+    def decoded(self, seconds):
+        with self.lock:
+            self.decode.add(seconds)
+
+    def painted(self, latency_s):
+        with self.lock:
+            self.paint_latency.add(latency_s)
+
+    def sample(self, camera, jitter, frames_in, frames_painted):
+        """
+        Close the window into a row and return it. jitter is the camera's
+        rtpjitterbuffer stats as a dict (or None); frames_in/painted are
+        cumulative counts.
+        """
+        now = time.monotonic()
+        with self.lock:
+            seconds = max(now - self.window_start, 1e-3)
+            self.window_start = now
+            intervals = self.intervals
+            decode, latency, paint_latency = self.decode, self.latency, self.paint_latency
+            self._new_window()
+
+        row = dict.fromkeys(FIELDS)
+        row["time"] = round(time.time(), 3)
+        row["camera"] = camera + 1
+        if jitter is not None:
+            last = self.counters.get(camera, jitter)
+            for field, key in (("packets", "num-pushed"), ("lost", "num-lost"), ("late", "num-late")):
+                delta = jitter[key] - last[key]
+                row[field] = delta if delta >= 0 else jitter[key]  # counters restart with the pipeline
+            self.counters[camera] = jitter
+            row["net_jitter_ms"] = round(jitter["avg-jitter"] / 1e6, 2)
+        got = frames_in - self.frames[0]
+        shown = frames_painted - self.frames[1]
+        self.frames = (frames_in, frames_painted)
+        row["fps_in"] = round(got / seconds, 1)
+        row["fps_painted"] = round(shown / seconds, 1)
+        row["gui_dropped"] = max(got - shown, 0)
+        if len(intervals) > 1:
+            mean = sum(intervals) / len(intervals)
+            var = sum((i - mean) ** 2 for i in intervals) / len(intervals)
+            row["frame_jitter_ms"] = round(math.sqrt(var) * 1000, 2)
+        if decode.count:
+            row["decode_ms"] = round(decode.mean * 1000, 2)
+            row["decode_max_ms"] = round(decode.peak * 1000, 2)
+        if latency.count:
+            row["latency_ms"] = round(latency.mean * 1000, 1)
+        if paint_latency.count:
+            row["paint_latency_ms"] = round(paint_latency.mean * 1000, 1)
+
+        self.rows.append(row)
+        if self.path:
+            self.append_csv(self.path, row)
+        return row
+
+    def append_csv(self, path, row):
+        new = not os.path.exists(path) or os.path.getsize(path) == 0
+        with open(path, "a", newline="") as f:
+            writer = csv.DictWriter(f, FIELDS)
+            if new:
+                writer.writeheader()
+            writer.writerow(row)
+
+    def write_csv(self, path):
+        """Write every kept row to path."""
+        with open(path, "w", newline="") as f:
+            writer = csv.DictWriter(f, FIELDS)
+            writer.writeheader()
+            writer.writerows(list(self.rows))
+
+def overlay_text(row):
+    """A few lines summarising row for drawing over the video."""
+    def value(key, unit=""):
+        v = row.get(key)
+        return "-" if v is None else f"{v}{unit}"
+    return "\n".join((
+        f"Cam {row['camera']}  link: {value('packets')} pkt/s  lost {value('lost')}  late {value('late')}"
+        f"  jitter {value('net_jitter_ms', ' ms')}",
+        f"decode {value('decode_ms', ' ms')} (max {value('decode_max_ms', ' ms')})",
+        f"frames {value('fps_in')}/s in, {value('fps_painted')}/s painted, {value('gui_dropped')} dropped"
+        f"  interval jitter {value('frame_jitter_ms', ' ms')}",
+        f"latency {value('latency_ms', ' ms')} at sink, {value('paint_latency_ms', ' ms')} painted",
+    ))